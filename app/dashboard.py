@@ -1,11 +1,8 @@
 import streamlit as st
 from auto_research.config import FRED_API_KEY, WATCHLIST
-from auto_research.prices import latest_prices
-from auto_research.news import top_headlines
-from auto_research.macro import macro_dataframe
-from auto_research.news import top_headlines, add_headline_sentiment  # make sure this import is present
 import io
 from auto_research.db import init_db, save_prices_snapshot, save_news_snapshot
+from auto_research import instrument
 
 import datetime as dt
 import ast
@@ -15,6 +12,57 @@ st.set_page_config(page_title="Auto Research", layout="wide")
 st.title("Auto Research – Dashboard")
 init_db()
 
+# ---------- Shared fetches (one upstream call per distinct request, across all sessions) ----------
+# Results live in the process-wide SharedFetcher (auto_research/shared.py): identical
+# requests from concurrent sessions share one in-flight fetch, and results are reused
+# for a per-source TTL (prices 60 s, news 5 min, macro 1 h). prices/news/macro
+# (yfinance, feedparser, VADER, requests) are imported on first fetch.
+def _cached_prices(symbols: tuple[str, ...]):
+    from auto_research.shared import shared_prices
+
+    with st.spinner("Fetching prices…"):
+        return shared_prices(symbols)
+
+
+def _cached_headlines(ticker_map: dict, hours_lookback: int, max_items: int):
+    from auto_research.shared import shared_headlines
+
+    with st.spinner("Fetching headlines…"):
+        return shared_headlines(ticker_map, hours_lookback=hours_lookback, max_items=max_items)
+
+
+def _cached_macro(series_ids: tuple[str, ...], start: str):
+    from auto_research.shared import shared_macro
+
+    with st.spinner("Fetching FRED series…"):
+        return shared_macro(series_ids, start=start)
+
+
+def _with_badges(df_news):
+    """Add VADER sentiment (if missing) and a badge column for display."""
+    if df_news is None or df_news.empty:
+        return df_news
+    if "sentiment" not in df_news.columns:
+        from auto_research.news import add_headline_sentiment
+        df_news = add_headline_sentiment(df_news, text_col="title")
+    badge_map = {
+        "Positive": "👍 Positive",
+        "Neutral": "😐 Neutral",
+        "Negative": "👎 Negative",
+    }
+    df_news["sentiment_badge"] = df_news["sentiment"].map(badge_map)
+    return df_news
+
+
+def _current_ticker_map(symbols: list[str]) -> dict:
+    """The News tab's ticker→keywords map if it parses, else each symbol matching itself."""
+    try:
+        ticker_map = ast.literal_eval(st.session_state.get("news_ticker_map", "") or "{}")
+    except (ValueError, SyntaxError):
+        ticker_map = {}
+    return ticker_map if isinstance(ticker_map, dict) and ticker_map else {t: [t] for t in symbols}
+
+
 def _clean_symbols(csv_text: str) -> list[str]:
     raw = [t.strip().upper() for t in (csv_text or "").split(",")]
     # keep only letters/numbers/.- (common for tickers)
@@ -39,8 +87,38 @@ with st.sidebar:
     )
     st.caption("Tip: put keys in your .env (see .env.example).")
 
+    st.divider()
+    refresh_deadline = st.slider("Refresh deadline (s)", 5, 60, 20, 5, key="refresh_deadline")
+    if st.button("🔄 Refresh all", key="refresh_all_btn", help="Prices, news and macro fetched concurrently"):
+        from auto_research.refresh import refresh_all
+
+        symbols_all = _clean_symbols(st.session_state.get("watchlist_input", ",".join(WATCHLIST)))
+        with st.spinner("Refreshing prices, news and macro…"):
+            result = refresh_all(
+                symbols_all,
+                ticker_map=_current_ticker_map(symbols_all),
+                macro_start=st.session_state.get("macro_start", dt.date(2000, 1, 1)).isoformat(),
+                news_lookback=st.session_state.get("news_lookback", 48),
+                deadline=refresh_deadline,
+                sources=["prices", "news", "macro"] if symbols_all else ["macro"],
+            )
+        if result.get("prices") is not None:
+            st.session_state["prices_df"] = result["prices"]
+        if result.get("news") is not None:
+            from auto_research.news import filter_by_tickers
+
+            # Same watchlist filter as the News tab's "Fetch headlines"
+            wl_text = st.session_state.get("watchlist_input", ",".join(WATCHLIST))
+            news_watchlist = [t.strip().upper() for t in wl_text.split(",") if t.strip()]
+            st.session_state["news_df"] = _with_badges(filter_by_tickers(result["news"], news_watchlist))
+        if result.get("macro") is not None:
+            st.session_state["macro_df"] = result["macro"]
+        st.caption(f"Done in {result['elapsed']['total']:.1f}s")
+        for source, err in result["errors"].items():
+            st.warning(f"{source}: {err}")
+
 # ---------- TABS ----------
-tabs = st.tabs(["Overview", "📈 Prices", "🗞️ Top News", "📊 Macro"])
+tabs = st.tabs(["Overview", "📈 Prices", "🗞️ Top News", "📊 Macro", "🩺 Diagnostics"])
 
 with tabs[0]:
     st.success("Environment OK 🎉")
@@ -73,29 +151,57 @@ with tabs[1]:
 
     if run_prices and symbols:
         try:
-            df_prices = latest_prices(symbols)
-            if df_prices.empty:
-                st.info("No data returned. Try different tickers or check your internet.")
-            else:
-                st.dataframe(df_prices, use_container_width=True)
-
-                # Download CSV of the fetched data
-                csv_bytes = df_prices.to_csv(index=False).encode("utf-8")
-                st.download_button(
-                    "Download CSV",
-                    data=csv_bytes,
-                    file_name="prices_snapshot.csv",
-                    mime="text/csv",
-                    key="download_prices_csv",
-                )
-
-                # Save last 30 rows to DB if user clicks
-                if save_prices:
-                    n = save_prices_snapshot(df_prices)
-                    st.success(f"Saved {n} price rows to the database.")
+            st.session_state["prices_df"] = _cached_prices(tuple(symbols))
+            # Long-lived, process-wide price state: a failed symbol keeps its last known values
+            from auto_research.snapshot import watchlist_store
+
+            watchlist_store().update_frame(st.session_state["prices_df"])
         except Exception as e:
             st.error(f"Error fetching prices: {e}")
 
+    # Render the last fetched frame on every rerun (widget changes don't refetch)
+    df_prices = st.session_state.get("prices_df")
+    if df_prices is not None:
+        if df_prices.empty:
+            st.info("No data returned. Try different tickers or check your internet.")
+        else:
+            st.dataframe(df_prices, use_container_width=True)
+
+            # Download CSV of the fetched data
+            csv_bytes = df_prices.to_csv(index=False).encode("utf-8")
+            st.download_button(
+                "Download CSV",
+                data=csv_bytes,
+                file_name="prices_snapshot.csv",
+                mime="text/csv",
+                key="download_prices_csv",
+            )
+
+            # Save last 30 rows of the already-fetched frame to DB if user clicks
+            if save_prices:
+                n = save_prices_snapshot(df_prices)
+                st.success(f"Saved {n} price rows to the database.")
+
+            import pandas as pd
+            from auto_research.snapshot import watchlist_store
+
+            store = watchlist_store()
+            with st.expander(f"Last known prices & top movers ({len(store)} tracked symbols)"):
+                view = store.frame(symbols)
+                view["as_of"] = pd.to_datetime(view["as_of"], unit="s")
+                st.dataframe(view, use_container_width=True)
+                movers_n = st.slider("Top movers", 3, 25, 5, key="movers_n")
+                colM1, colM2 = st.columns(2)
+                with colM1:
+                    st.markdown("**Gainers**")
+                    st.dataframe(store.top_movers(movers_n)[["last_price", "pct_change"]], use_container_width=True)
+                with colM2:
+                    st.markdown("**Losers**")
+                    st.dataframe(store.top_movers(movers_n, ascending=True)[["last_price", "pct_change"]],
+                                 use_container_width=True)
+    elif save_prices:
+        st.info("Fetch prices first, then save the snapshot.")
+
 
 with tabs[2]:
     st.subheader("🗞️ Top News – Tagged by Ticker")
@@ -136,51 +242,68 @@ with tabs[2]:
             ticker_map = ast.literal_eval(mapping_text) if mapping_text.strip() else {}
             if not ticker_map:
                 st.warning("Your ticker→keywords map is empty. Add at least one ticker, e.g., {'TSLA':['TSLA']}.")
+                st.session_state.pop("news_df", None)
             else:
-                df_news = top_headlines(ticker_map, hours_lookback=lookback, max_items=50)
-                
-                if df_news.empty:
-                     df_news = df_news[df_news["tickers"].map(lambda ts: bool(ts))]
-                     wl_set = set(watchlist)
-                     df_news = df_news[
-                          df_news["tickers"].map(lambda ts: bool(wl_set.intersection(set(ts))))
-                     ]
-                
-                if df_news.empty:
-                    st.info("No tagged headlines for your tickers. Increase lookback or add broader keywords (e.g., 'Tesla').")
-                else:
-                    # ✅ Add VADER sentiment and a badge column
-                    df_news = add_headline_sentiment(df_news, text_col="title")
-                    badge_map = {
-                        "Positive": "👍 Positive",
-                        "Neutral": "😐 Neutral",
-                        "Negative": "👎 Negative",
-                    }
-                    df_news["sentiment_badge"] = df_news["sentiment"].map(badge_map)
-
-                    # Optional: pick a tidy column order
-                    cols = ["published", "title", "sentiment_badge", "tickers", "link", "sentiment_score"]
-                    cols = [c for c in cols if c in df_news.columns]
-                    st.dataframe(df_news[cols], use_container_width=True)
-                if not df_news.empty:
-                    # Download current news as CSV
-                    csv_bytes_news = df_news.to_csv(index=False).encode("utf-8")
-                    st.download_button(
-                        "Download CSV",
-                        data=csv_bytes_news,
-                        file_name="news_snapshot.csv",
-                        mime="text/csv",
-                        key="download_news_csv",
-                    )
-
-                    # Save to DB (last 30 rows)
-                    if st.button("Save snapshot", key="save_news_btn"):
-                        n = save_news_snapshot(df_news)
-                        st.success(f"Saved {n} news rows to the database.")
+                from auto_research.news import filter_by_tickers
+
+                df_news = _cached_headlines(ticker_map, lookback, 50)
+                df_news = filter_by_tickers(df_news, watchlist)
+
+                # ✅ Add VADER sentiment and a badge column
+                st.session_state["news_df"] = _with_badges(df_news)
 
         except Exception as e:
             st.error(f"Error: {e}")
 
+    # Render the last fetched headlines on every rerun (no refetch)
+    df_news = st.session_state.get("news_df")
+    if df_news is not None:
+        if df_news.empty:
+            st.info("No tagged headlines for your tickers. Increase lookback or add broader keywords (e.g., 'Tesla').")
+        else:
+            # Optional: pick a tidy column order
+            cols = ["published", "title", "sentiment_badge", "tickers", "link", "sentiment_score"]
+            cols = [c for c in cols if c in df_news.columns]
+            st.dataframe(df_news[cols], use_container_width=True)
+
+            # Download current news as CSV
+            csv_bytes_news = df_news.to_csv(index=False).encode("utf-8")
+            st.download_button(
+                "Download CSV",
+                data=csv_bytes_news,
+                file_name="news_snapshot.csv",
+                mime="text/csv",
+                key="download_news_csv",
+            )
+
+            # Save to DB (last 30 rows) — reuses the frame held in session state
+            if st.button("Save snapshot", key="save_news_btn"):
+                n = save_news_snapshot(df_news)
+                st.success(f"Saved {n} news rows to the database.")
+
+    # Sentiment trend from the stored rollups (updated on every saved snapshot)
+    st.divider()
+    st.markdown("**Sentiment trend (saved headlines)**")
+    colT1, colT2 = st.columns([1, 1])
+    with colT1:
+        trend_bucket = st.radio("Bucket", ["day", "hour"], horizontal=True, key="trend_bucket")
+    with colT2:
+        trend_months = st.slider("Months", 1, 24, 6, key="trend_months")
+    if watchlist:
+        from auto_research.queries import sentiment_trend
+
+        trend = sentiment_trend(
+            watchlist,
+            start=dt.datetime.utcnow() - dt.timedelta(days=30 * trend_months),
+            bucket=trend_bucket,
+        )
+        if trend.empty:
+            st.info("No saved, scored headlines for your tickers in this window yet.")
+        else:
+            st.line_chart(trend.pivot(index="bucket_start", columns="ticker", values="mean_score"))
+            st.caption("Mean VADER compound per bucket; headline counts below.")
+            st.bar_chart(trend.pivot(index="bucket_start", columns="ticker", values="headlines"))
+
 # ...existing tabs[0], tabs[1], tabs[2]...
 
 with tabs[3]:
@@ -196,11 +319,56 @@ with tabs[3]:
 
     if run_macro:
         try:
-            df_macro = macro_dataframe(["TOTALSA", "INDPRO"], start=start.isoformat())
-            if df_macro.empty:
-                st.warning("No data returned. Check your FRED API key or try a wider date range.")
-            else:
-                st.dataframe(df_macro.tail(12), use_container_width=True)
-                st.line_chart(df_macro)  # Streamlit draws both series on one chart
+            st.session_state["macro_df"] = _cached_macro(("TOTALSA", "INDPRO"), start.isoformat())
         except Exception as e:
             st.error(f"Error fetching FRED data: {e}")
+
+    df_macro = st.session_state.get("macro_df")
+    if df_macro is not None:
+        if df_macro.empty:
+            st.warning("No data returned. Check your FRED API key or try a wider date range.")
+        else:
+            st.dataframe(df_macro.tail(12), use_container_width=True)
+            st.line_chart(df_macro)  # Streamlit draws both series on one chart
+
+
+with tabs[4]:
+    st.subheader("🩺 Diagnostics – where the time goes")
+    st.caption(
+        "Per-stage latency (fetch, parse, tag, score, save) and cache hit rates for this process. "
+        "Enable, use the other tabs, then come back here."
+    )
+
+    colD1, colD2 = st.columns([1, 1])
+    with colD1:
+        on = st.toggle("Enable instrumentation", value=instrument.is_enabled(), key="instrument_on")
+        if on != instrument.is_enabled():
+            instrument.enable(on)
+    with colD2:
+        if st.button("Reset measurements", key="instrument_reset_btn"):
+            instrument.reset()
+
+    stages = instrument.snapshot()
+    if stages.empty:
+        st.info("No measurements yet." if instrument.is_enabled() else "Instrumentation is off.")
+    else:
+        st.markdown("**Stage latency (recent calls)**")
+        st.dataframe(stages, use_container_width=True, hide_index=True)
+        st.bar_chart(stages.set_index("stage")[["p50_ms", "p90_ms", "p99_ms"]])
+
+    rates = instrument.hit_rates()
+    if not rates.empty:
+        st.markdown("**Cache hit rates**")
+        st.dataframe(rates, use_container_width=True, hide_index=True)
+
+    # Always on (not gated by the toggle): shared by every session in this process
+    from auto_research.shared import shared_fetcher
+
+    st.markdown("**Shared fetches (all sessions)**")
+    shared_stats = shared_fetcher().stats()
+    if shared_stats.empty:
+        st.info("No shared fetches yet.")
+    else:
+        st.dataframe(shared_stats, use_container_width=True, hide_index=True)
+    if st.button("Clear shared cache", key="shared_clear_btn"):
+        shared_fetcher().clear()
@@ -0,0 +1,206 @@
+# auto_research/archive.py
+"""
+Cold storage for old snapshots: date-partitioned Parquet next to the SQLite DB.
+
+    archive/prices/date=2024-01-05/part-<id>.parquet
+    archive/news/date=2024-01-05/part-<id>.parquet
+
+``compact()`` moves rows older than a cutoff out of SQLite into Parquet
+(partitioned by snapshot date) and deletes them from SQLite. ``read_prices``
+/ ``read_news`` union the hot SQLite tail with the cold partitions, pruning
+partitions by date and pushing ticker filters into the Parquet scan.
+
+Requires pyarrow (``poetry install --with archive``).
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, Optional, Sequence
+import datetime as dt
+import uuid
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import DateTime, Float, Integer, delete, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from auto_research.db import ArchivedLink, News, NewsTicker, Prices, ROOT, get_engine, ensure_db
+from auto_research.queries import NEWS_COLUMNS, PRICE_COLUMNS, TimeLike, _tickers, _ts, news_history, price_history
+
+ARCHIVE_DIR = ROOT / "archive"
+DEFAULT_KEEP_DAYS = 30
+
+_TABLES = {"prices": Prices.__table__, "news": News.__table__}
+
+
+def _arrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+    except ImportError as exc:  # optional dependency
+        raise RuntimeError("Parquet archive needs pyarrow. Install it with: poetry install --with archive") from exc
+    return pa, ds, pq
+
+
+def _schema(pa, name: str):
+    """Arrow schema from the SQL column types, so all-NULL days don't get written as the null type."""
+    fields = []
+    for col in _TABLES[name].columns:
+        if isinstance(col.type, Integer):
+            typ = pa.int64()
+        elif isinstance(col.type, Float):
+            typ = pa.float64()
+        elif isinstance(col.type, DateTime):
+            typ = pa.timestamp("us")
+        else:
+            typ = pa.string()
+        fields.append(pa.field(col.name, typ))
+    return pa.schema(fields)
+
+
+# ---------- Compaction ----------
+def compact(
+    older_than_days: int = DEFAULT_KEEP_DAYS,
+    tables: Iterable[str] = ("prices", "news"),
+    archive_dir: Optional[Path] = None,
+    batch_rows: int = 200_000,
+) -> Dict[str, int]:
+    """
+    Move rows with snapshot_time older than ``older_than_days`` from SQLite into
+    Parquet partitions and delete them from SQLite. Returns rows archived per table.
+    Each batch is written to Parquet before the matching rows are deleted, so an
+    interruption can at worst leave a row in both places (reads dedupe).
+    """
+    pa, _, pq = _arrow()
+    ensure_db()
+    root = Path(archive_dir) if archive_dir else ARCHIVE_DIR
+    cutoff = dt.datetime.utcnow() - dt.timedelta(days=older_than_days)
+    moved: Dict[str, int] = {}
+    for name in tables:
+        table = _TABLES[name]
+        schema = _schema(pa, name)
+        moved[name] = 0
+        while True:
+            q = select(table).where(table.c.snapshot_time < cutoff).order_by(table.c.id).limit(batch_rows)
+            with get_engine().connect() as conn:
+                df = pd.read_sql(q, conn, parse_dates=[f.name for f in schema if pa.types.is_timestamp(f.type)])
+            if df.empty:
+                break
+            df["date"] = df["snapshot_time"].dt.strftime("%Y-%m-%d")
+            for day, part in df.groupby("date", sort=True):
+                out = root / name / f"date={day}"
+                out.mkdir(parents=True, exist_ok=True)
+                pq.write_table(
+                    pa.Table.from_pandas(part.drop(columns=["date"]), schema=schema, preserve_index=False),
+                    out / f"part-{uuid.uuid4().hex}.parquet",
+                )
+            ids = df["id"].tolist()
+            with get_engine().begin() as conn:
+                if name == "news":  # archived rows keep their tickers in tickers_json
+                    conn.execute(delete(NewsTicker.__table__).where(NewsTicker.__table__.c.news_id.in_(ids)))
+                    # Their rollup contribution stays; remember the links so re-saves aren't counted again
+                    links = [{"link": link} for link in dict.fromkeys(df["link"].fillna("")) if link]
+                    if links:
+                        conn.execute(sqlite_insert(ArchivedLink.__table__).on_conflict_do_nothing(), links)
+                conn.execute(delete(table).where(table.c.id.in_(ids)))
+            moved[name] += len(df)
+    return moved
+
+
+# ---------- Reads (hot SQLite + cold Parquet) ----------
+def _cold(
+    name: str,
+    columns: Sequence[str],
+    start: TimeLike,
+    end: TimeLike,
+    row_filter=None,
+    archive_dir: Optional[Path] = None,
+) -> pd.DataFrame:
+    pa, ds, _ = _arrow()
+    path = (Path(archive_dir) if archive_dir else ARCHIVE_DIR) / name
+    if not path.exists():
+        return pd.DataFrame(columns=list(columns))
+    # Same explicit schema as compact() writes; older files are cast to it on read
+    dataset = ds.dataset(
+        str(path),
+        schema=_schema(pa, name).append(pa.field("date", pa.string())),
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive"),
+    )
+    expr = None
+
+    def _and(e):
+        nonlocal expr
+        expr = e if expr is None else expr & e
+
+    # Partition pruning on the date directory, then exact row predicates
+    if start is not None:
+        _and(ds.field("date") >= _ts(start).strftime("%Y-%m-%d"))
+        _and(ds.field("snapshot_time") >= pa.scalar(_ts(start), type=pa.timestamp("us")))
+    if end is not None:
+        _and(ds.field("date") <= _ts(end).strftime("%Y-%m-%d"))
+        _and(ds.field("snapshot_time") <= pa.scalar(_ts(end), type=pa.timestamp("us")))
+    if row_filter is not None:
+        _and(row_filter(ds))
+    return dataset.to_table(columns=list(columns), filter=expr).to_pandas()
+
+
+def _union(hot: pd.DataFrame, cold: pd.DataFrame) -> pd.DataFrame:
+    frames = [f for f in (cold, hot) if not f.empty]
+    if not frames:
+        return hot
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+def read_prices(
+    tickers: Optional[Iterable[str]] = None,
+    start: TimeLike = None,
+    end: TimeLike = None,
+    columns: Optional[Sequence[str]] = None,
+    archive_dir: Optional[Path] = None,
+) -> pd.DataFrame:
+    """Price snapshots from SQLite and the Parquet archive, ordered by (ticker, snapshot_time)."""
+    cols = list(columns) if columns else list(PRICE_COLUMNS)
+    need = list(dict.fromkeys(cols + ["ticker", "snapshot_time"]))
+    syms = _tickers(tickers)
+    hot = price_history(syms, start=start, end=end, columns=need)
+    cold = _cold(
+        "prices", need, start, end,
+        row_filter=(lambda ds: ds.field("ticker").isin(syms)) if syms is not None else None,
+        archive_dir=archive_dir,
+    )
+    out = _union(hot, cold).sort_values(["ticker", "snapshot_time"], kind="stable")
+    return out[cols].reset_index(drop=True)
+
+
+def read_news(
+    tickers: Optional[Iterable[str]] = None,
+    start: TimeLike = None,
+    end: TimeLike = None,
+    columns: Optional[Sequence[str]] = None,
+    archive_dir: Optional[Path] = None,
+) -> pd.DataFrame:
+    """
+    Headlines from SQLite and the Parquet archive, newest snapshot first, one
+    row per linked story (linkless stories are all kept). Time bounds apply to
+    snapshot_time (the partition key).
+    """
+    _arrow()
+    import pyarrow.compute as pc
+
+    cols = list(columns) if columns else list(NEWS_COLUMNS)
+    need = list(dict.fromkeys(cols + ["snapshot_time", "link"]))
+    syms = _tickers(tickers)
+    hot = news_history(syms, start=start, end=end, columns=need, on="snapshot_time")
+
+    def _tickers_expr(ds):
+        exprs = [pc.match_substring(ds.field("tickers_json"), f'"{s}"') for s in syms]
+        out = exprs[0]
+        for e in exprs[1:]:
+            out = out | e
+        return out
+
+    cold = _cold("news", need, start, end, row_filter=_tickers_expr if syms else None, archive_dir=archive_dir)
+    out = _union(hot, cold).sort_values("snapshot_time", ascending=False, kind="stable")
+    has_link = out["link"].fillna("") != ""
+    out = out[~(out["link"].duplicated(keep="first") & has_link)]
+    return out[cols].reset_index(drop=True)
@@ -0,0 +1,224 @@
+# auto_research/collector.py
+"""
+Headless collector: snapshots prices, news and macro on independent intervals.
+
+    python -m auto_research.collector                  # run forever
+    python -m auto_research.collector --once           # one pass of every job (cron)
+    python -m auto_research.collector --prices-every 120 --news-every 300 --macro-every 3600
+    python -m auto_research.collector --dedupe-news    # one-off: collapse duplicate news links, then exit
+
+One long-lived process keeps the feed/sentiment/dedup caches, the FRED session and
+the DB engine warm between runs. A job that is still running when it comes
+due again is skipped rather than stacked.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List, Optional
+import argparse
+import datetime as dt
+import logging
+import signal
+import threading
+import time
+
+from auto_research.config import WATCHLIST, _get_env
+from auto_research.db import dedupe_news_links, init_db, save_prices_snapshot
+
+log = logging.getLogger("auto_research.collector")
+
+DEFAULT_PRICES_EVERY = 300    # seconds
+DEFAULT_NEWS_EVERY = 600
+DEFAULT_MACRO_EVERY = 6 * 3600
+DEFAULT_ARCHIVE_EVERY = 24 * 3600
+DEFAULT_MACRO_SERIES = ("TOTALSA", "INDPRO")
+
+
+class Job:
+    """A named task run on a fixed interval in its own thread; overlapping runs are skipped."""
+
+    def __init__(self, name: str, interval: float, fn: Callable[[], int]):
+        self.name = name
+        self.interval = float(interval)
+        self.fn = fn
+        self.next_run = 0.0
+        self.runs = 0
+        self.skips = 0
+        self.failures = 0
+        self._running = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def due(self, now: float) -> bool:
+        return self.interval > 0 and now >= self.next_run
+
+    def start(self, now: float) -> bool:
+        """Launch a run unless the previous one is still going. Returns True if launched."""
+        self.next_run = now + self.interval
+        if not self._running.acquire(blocking=False):
+            self.skips += 1
+            log.warning("%s: previous run still in progress, skipping", self.name)
+            return False
+        self._thread = threading.Thread(target=self._run, name=f"collector-{self.name}", daemon=True)
+        self._thread.start()
+        return True
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        t0 = time.perf_counter()
+        try:
+            n = self.fn()
+            self.runs += 1
+            log.info("%s: %s rows in %.2fs", self.name, n, time.perf_counter() - t0)
+        except Exception:
+            self.failures += 1
+            log.exception("%s: run failed", self.name)
+        finally:
+            self._running.release()
+
+
+# ---------- Job bodies ----------
+def collect_prices(symbols: List[str]) -> int:
+    from auto_research.prices import latest_prices
+
+    if not symbols:
+        return 0
+    return save_prices_snapshot(latest_prices(symbols), limit=None)
+
+
+def collect_news(ticker_map: Dict[str, List[str]], hours_lookback: int = 48) -> int:
+    from auto_research.dedup import default_dedup_index
+    from auto_research.news import iter_headlines, pipeline, save_to_db, score_sentiment, tag_tickers
+
+    if not ticker_map:
+        return 0
+    # Stories seen on earlier polls are dropped before tagging/scoring/saving.
+    # They are only recorded as seen once save_to_db has committed them.
+    index = default_dedup_index()
+    index.prune()
+    stored = pipeline(
+        iter_headlines(hours_lookback=hours_lookback),
+        index.filter,
+        tag_tickers(ticker_map),
+        score_sentiment(),
+        save_to_db(),
+        index.record,
+    )
+    return sum(1 for _ in stored)
+
+
+def collect_macro(series_ids: List[str]) -> int:
+    from auto_research.macro import macro_dataframe
+
+    if not series_ids:
+        return 0
+    # macro_dataframe persists into the local series store as it refreshes
+    df, errors = macro_dataframe(series_ids, max_age=None, with_errors=True)
+    for sid, err in errors.items():
+        log.warning("macro: %s failed: %s", sid, err)
+    return len(df)
+
+
+def compact_archive(keep_days: int) -> int:
+    from auto_research.archive import compact
+
+    return sum(compact(older_than_days=keep_days).values())
+
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def build_jobs(args: argparse.Namespace) -> List[Job]:
+    symbols = args.symbols or WATCHLIST
+    ticker_map = {t: [t] for t in symbols}
+    jobs = [
+        Job("prices", args.prices_every, lambda: collect_prices(symbols)),
+        Job("news", args.news_every, lambda: collect_news(ticker_map, hours_lookback=args.news_lookback)),
+        Job("macro", args.macro_every, lambda: collect_macro(args.macro_series)),
+    ]
+    # Archiving is optional: only scheduled when pyarrow (poetry install --with archive) is present
+    if args.archive_every > 0:
+        if _has_pyarrow():
+            jobs.append(Job("archive", args.archive_every, lambda: compact_archive(args.archive_keep_days)))
+        else:
+            log.info("archive: pyarrow not installed, Parquet compaction disabled")
+    return jobs
+
+
+def run(jobs: List[Job], once: bool = False, stop: Optional[threading.Event] = None, tick: float = 1.0) -> None:
+    """Scheduler loop: start each job when due until ``stop`` is set (or after one pass with ``once``)."""
+    stop = stop or threading.Event()
+    init_db()
+    if once:
+        for job in jobs:
+            if job.interval > 0:
+                job.start(time.monotonic())
+        for job in jobs:
+            job.join()
+        return
+    while not stop.is_set():
+        now = time.monotonic()
+        for job in jobs:
+            if job.due(now):
+                job.start(now)
+        stop.wait(tick)
+    for job in jobs:
+        job.join(timeout=30)
+
+
+def _csv(value: str) -> List[str]:
+    return [s.strip().upper() for s in (value or "").split(",") if s.strip()]
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(_get_env(name, "") or default)
+    except ValueError:
+        return default
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(prog="python -m auto_research.collector", description=__doc__.split("\n\n")[0])
+    ap.add_argument("--symbols", type=_csv, default=None, help="comma-separated tickers (default: WATCHLIST)")
+    ap.add_argument("--prices-every", type=float, default=_env_float("COLLECT_PRICES_EVERY", DEFAULT_PRICES_EVERY),
+                    help="seconds between price snapshots (0 disables)")
+    ap.add_argument("--news-every", type=float, default=_env_float("COLLECT_NEWS_EVERY", DEFAULT_NEWS_EVERY),
+                    help="seconds between news snapshots (0 disables)")
+    ap.add_argument("--macro-every", type=float, default=_env_float("COLLECT_MACRO_EVERY", DEFAULT_MACRO_EVERY),
+                    help="seconds between FRED refreshes (0 disables)")
+    ap.add_argument("--archive-every", type=float, default=_env_float("COLLECT_ARCHIVE_EVERY", DEFAULT_ARCHIVE_EVERY),
+                    help="seconds between Parquet compactions of old snapshots (0 disables; skipped without pyarrow)")
+    ap.add_argument("--archive-keep-days", type=int, default=30, help="days of snapshots kept hot in SQLite")
+    ap.add_argument("--macro-series", type=_csv, default=_csv(_get_env("MACRO_SERIES", ",".join(DEFAULT_MACRO_SERIES))))
+    ap.add_argument("--news-lookback", type=int, default=48, help="hours")
+    ap.add_argument("--once", action="store_true", help="run every enabled job once and exit")
+    ap.add_argument("--dedupe-news", action="store_true",
+                    help="delete older news rows that share a link (keeps the newest), index links and exit")
+    ap.add_argument("-v", "--verbose", action="store_true")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    if args.dedupe_news:
+        init_db()
+        log.info("dedupe-news: %d row(s) removed", dedupe_news_links())
+        return
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stop.set())
+
+    jobs = build_jobs(args)
+    log.info("collector started at %s: %s", dt.datetime.utcnow().isoformat(timespec="seconds"),
+             ", ".join(f"{j.name} every {j.interval:g}s" for j in jobs if j.interval > 0))
+    run(jobs, once=args.once, stop=stop)
+
+
+if __name__ == "__main__":
+    main()
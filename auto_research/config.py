@@ -1,13 +1,17 @@
 # auto_research/config.py
 import os
+import sys
 from pathlib import Path
 
-# Optional: support .streamlit/secrets.toml (Streamlit Cloud or local secrets)
-try:
-    import streamlit as st
-    _secrets = getattr(st, "secrets", {})
-except Exception:
-    _secrets = {}
+
+def _secrets():
+    # Optional: support .streamlit/secrets.toml (Streamlit Cloud or local secrets).
+    # Only consulted when running under streamlit; never imports it for headless use.
+    st = sys.modules.get("streamlit")
+    try:
+        return getattr(st, "secrets", {}) if st is not None else {}
+    except Exception:
+        return {}
 
 # Load .env from repo root
 try:
@@ -19,7 +23,8 @@ except Exception:
 
 def _get_env(name: str, default: str = "") -> str:
     # priority: Streamlit secrets → OS env → default
-    val = (_secrets.get(name) if isinstance(_secrets, dict) else None) or os.getenv(name, default)
+    secrets = _secrets()
+    val = (secrets.get(name) if isinstance(secrets, dict) else None) or os.getenv(name, default)
     # normalize whitespace/quotes that sometimes sneak in on Windows
     if isinstance(val, str):
         val = val.strip().strip('"').strip("'")
@@ -34,3 +39,5 @@ WATCHLIST = [
     if s.strip()
 ]
 
+# SQLite engine profile (see auto_research.db.SQLITE_PROFILES): "tuned" or "default"
+DB_PROFILE = _get_env("DB_PROFILE", "tuned") or "tuned"
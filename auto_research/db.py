@@ -1,20 +1,97 @@
 # auto_research/db.py
 from __future__ import annotations
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, Optional, Union
 import json
+import logging
+import threading
 import datetime as dt
 from pathlib import Path
 
-from sqlmodel import SQLModel, Field, create_engine, Session
+from sqlalchemy import Index, event, insert, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.engine import Engine
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import SQLModel, Field, create_engine
+
+from auto_research.config import DB_PROFILE
+from auto_research.instrument import timed
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+log = logging.getLogger("auto_research.db")
 
 # DB file lives at repo root, e.g., ./auto_research.db
 ROOT = Path(__file__).resolve().parents[1]
 DB_PATH = ROOT / "auto_research.db"
-engine = create_engine(f"sqlite:///{DB_PATH}", echo=False, future=True)
+
+# Connection PRAGMAs per engine profile. "tuned" lets the dashboard read while
+# a background saver writes (WAL) and waits on locks instead of failing.
+SQLITE_PROFILES: Dict[str, Dict[str, Union[str, int]]] = {
+    "default": {},
+    "tuned": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64_000,  # negative = KiB, i.e. ~64 MB page cache
+        "busy_timeout": 5_000,  # ms
+        "temp_store": "MEMORY",
+    },
+}
+
+
+def make_engine(path: Union[str, Path] = DB_PATH,
+                profile: Union[str, Dict[str, Union[str, int]]] = "tuned") -> Engine:
+    """Create a SQLite engine whose connections get the profile's PRAGMAs on connect."""
+    pragmas = SQLITE_PROFILES[profile] if isinstance(profile, str) else dict(profile)
+    eng = create_engine(f"sqlite:///{path}", echo=False, future=True)
+
+    @event.listens_for(eng, "connect")
+    def _set_pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        for key, value in pragmas.items():
+            cur.execute(f"PRAGMA {key}={value}")
+        cur.close()
+
+    return eng
+
+
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """Process-wide engine for DB_PATH, created on first use (not at import)."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = make_engine(DB_PATH, DB_PROFILE)
+    return _engine
+
+
+def set_engine(eng: Optional[Engine]) -> Optional[Engine]:
+    """Swap the process-wide engine (e.g. for a temp DB); returns the previous one."""
+    global _engine, _db_ready
+    with _engine_lock:
+        previous, _engine = _engine, eng
+        _db_ready = False
+    return previous
+
+
+def __getattr__(name: str):
+    # ``from auto_research.db import engine`` / ``db.engine`` keep working
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # ---------- Models ----------
 class Prices(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_prices_ticker_snapshot_time", "ticker", "snapshot_time"),
+        Index("ix_prices_snapshot_time", "snapshot_time"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     snapshot_time: dt.datetime = Field(default_factory=lambda: dt.datetime.utcnow())
     ticker: str
@@ -23,92 +100,368 @@ class Prices(SQLModel, table=True):
 
 
 class News(SQLModel, table=True):
+    __table_args__ = (
+        # One row per story; snapshots upsert. Linkless stories ("") stay separate rows.
+        Index("ux_news_link", "link", unique=True, sqlite_where=text("link <> ''")),
+        Index("ix_news_snapshot_time", "snapshot_time"),
+        # Reads filter/sort on the story time: published, else snapshot_time
+        Index("ix_news_when", text("COALESCE(published, snapshot_time)")),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     snapshot_time: dt.datetime = Field(default_factory=lambda: dt.datetime.utcnow())
     published: Optional[dt.datetime] = None
     title: str
     link: str
-    tickers_json: str  # JSON-encoded list
+    tickers_json: str  # JSON-encoded list (display/export; lookups use NewsTicker)
     sentiment: Optional[str] = None
     sentiment_score: Optional[float] = None
 
 
+class NewsTicker(SQLModel, table=True):
+    """Headline <-> ticker association: one row per tagged ticker of a News row."""
+    __table_args__ = (
+        Index("ix_newsticker_ticker", "ticker", "news_id"),
+    )
+    news_id: int = Field(foreign_key="news.id", primary_key=True)
+    ticker: str = Field(primary_key=True)
+
+
+class SentimentRollup(SQLModel, table=True):
+    """
+    Incremental per-ticker sentiment aggregates: one row per (ticker, bucket,
+    bucket_start), bucket "hour" or "day" over COALESCE(published, snapshot_time).
+    Kept up to date by save_news_snapshot; mean = score_sum / headlines.
+    """
+    ticker: str = Field(primary_key=True)
+    bucket: str = Field(primary_key=True)
+    bucket_start: dt.datetime = Field(primary_key=True)  # naive UTC
+    headlines: int = 0
+    score_sum: float = 0.0
+    positive: int = 0   # compound >= 0.05
+    negative: int = 0   # compound <= -0.05
+    neutral: int = 0
+
+
+class ArchivedLink(SQLModel, table=True):
+    """
+    Links of News rows moved to the Parquet archive. Their rollup contribution
+    stays in SentimentRollup, so a later re-save of the same story is left out
+    of the rollups instead of being counted twice.
+    """
+    link: str = Field(primary_key=True)
+    archived_at: dt.datetime = Field(default_factory=lambda: dt.datetime.utcnow())
+
+
+class MacroObservation(SQLModel, table=True):
+    """Local FRED series store: one row per (series_id, date)."""
+    series_id: str = Field(primary_key=True)
+    date: dt.date = Field(primary_key=True)
+    value: Optional[float] = None
+    realtime_start: Optional[dt.date] = None  # FRED vintage of this value
+
+
+class MacroSeries(SQLModel, table=True):
+    """Per-series refresh bookkeeping for incremental FRED fetches."""
+    series_id: str = Field(primary_key=True)
+    obs_start: dt.date                        # earliest observation_start fetched so far
+    last_date: Optional[dt.date] = None       # last observation date stored
+    vintage: Optional[dt.date] = None         # latest realtime_start seen
+    refreshed_at: dt.datetime = Field(default_factory=lambda: dt.datetime.utcnow())
+
+
+class PriceBar(SQLModel, table=True):
+    """Local OHLCV bar cache: one row per (symbol, interval, ts)."""
+    symbol: str = Field(primary_key=True)
+    interval: str = Field(primary_key=True)   # yfinance interval, e.g. "1m", "1h", "1d"
+    ts: dt.datetime = Field(primary_key=True) # bar open time, naive UTC
+    open: Optional[float] = None
+    high: Optional[float] = None
+    low: Optional[float] = None
+    close: Optional[float] = None
+    adj_close: Optional[float] = None
+    volume: Optional[float] = None
+
+
+class PriceCoverage(SQLModel, table=True):
+    """Contiguous time range already fetched per (symbol, interval), for gap-only refreshes."""
+    symbol: str = Field(primary_key=True)
+    interval: str = Field(primary_key=True)
+    start: dt.datetime
+    end: dt.datetime
+    refreshed_at: dt.datetime = Field(default_factory=lambda: dt.datetime.utcnow())
+
+
 # ---------- Setup ----------
 def init_db() -> None:
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    SQLModel.metadata.create_all(engine)
+    with get_engine().connect() as conn:
+        tables = {r[0] for r in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'"))}
+    SQLModel.metadata.create_all(get_engine())
+    _migrate_indexes()
+    if "newsticker" not in tables:
+        _backfill_news_tickers()
+    if "sentimentrollup" not in tables:
+        with get_engine().begin() as conn:
+            _roll_up(conn, +1)  # one full pass; later saves update incrementally
+
+
+_db_ready = False
+
+def ensure_db() -> None:
+    """init_db() once per process (for modules that read/write outside the dashboard)."""
+    global _db_ready
+    if not _db_ready:
+        init_db()
+        _db_ready = True
+
+
+def _migrate_indexes() -> None:
+    """
+    create_all() only builds indexes with new tables, so add any missing ones
+    to tables created by older versions. Rows are never deleted here: if old
+    News rows share a link, the unique link index is skipped (with a warning)
+    until dedupe_news_links() is run.
+    """
+    with get_engine().begin() as conn:
+        existing = dict(conn.execute(text("SELECT name, sql FROM sqlite_master WHERE type = 'index'")).all())
+        ux_sql = existing.get("ux_news_link")
+        if ux_sql is not None and "WHERE" not in ux_sql.upper():
+            # Older full unique index also forced every linkless story into one row
+            conn.execute(text("DROP INDEX ux_news_link"))
+            del existing["ux_news_link"]
+        if "ix_news_published" in existing:
+            # Superseded by ix_news_when: queries never filter on published alone
+            conn.execute(text("DROP INDEX ix_news_published"))
+        if "ux_news_link" not in existing:
+            dupes = _duplicate_link_rows(conn)
+            if dupes:
+                log.warning(
+                    "news: %d row(s) share a link with a newer row, so the unique link index was not "
+                    "created and news saves will fail. Run auto_research.db.dedupe_news_links() "
+                    "(or the collector with --dedupe-news) to keep the newest row per link.", dupes,
+                )
+                existing["ux_news_link"] = None
+        _create_missing_indexes(conn, (Prices.__table__, News.__table__), existing)
+
+
+def _create_missing_indexes(conn, tables, existing) -> None:
+    # By name from sqlite_master: checkfirst can't see expression indexes (ix_news_when)
+    for table in tables:
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(conn)
+
+
+_DUPLICATE_LINK_IDS = (
+    "SELECT id FROM news WHERE link <> ''"
+    " AND id NOT IN (SELECT MAX(id) FROM news WHERE link <> '' GROUP BY link)"
+)
+
+
+def _duplicate_link_rows(conn) -> int:
+    return conn.exec_driver_sql(f"SELECT COUNT(*) FROM ({_DUPLICATE_LINK_IDS})").scalar()
+
+
+def dedupe_news_links() -> int:
+    """
+    Explicit migration for databases saved before News links were unique:
+    delete every older row that shares a non-empty link (the newest is kept,
+    along with its tickers and rollup contribution), then create the unique
+    link index. Logs what it removes. Returns the number of rows deleted.
+    """
+    ensure_db()
+    with get_engine().begin() as conn:
+        _stage_ids(conn, _DUPLICATE_LINK_IDS)
+        removed = conn.exec_driver_sql("SELECT COUNT(*) FROM temp.news_ids").scalar()
+        if removed:
+            sample = [r[0] for r in conn.exec_driver_sql("SELECT id FROM temp.news_ids LIMIT 20")]
+            log.warning("news: deleting %d duplicate-link row(s), e.g. ids %s", removed, sample)
+            _roll_up(conn, -1, staged=True)
+            conn.exec_driver_sql("DELETE FROM newsticker WHERE news_id IN (SELECT id FROM temp.news_ids)")
+            conn.exec_driver_sql("DELETE FROM news WHERE id IN (SELECT id FROM temp.news_ids)")
+        conn.exec_driver_sql("DROP TABLE temp.news_ids")
+        existing = {r[0] for r in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        _create_missing_indexes(conn, (News.__table__,), existing)
+    log.info("news: unique link index in place (%d duplicate row(s) removed)", removed)
+    return removed
+
+
+def _stage_ids(conn, select_sql: str, params=()) -> None:
+    """Fill temp.news_ids (this connection only) with the News ids selected by ``select_sql``."""
+    conn.exec_driver_sql("CREATE TEMP TABLE IF NOT EXISTS news_ids (id INTEGER PRIMARY KEY)")
+    conn.exec_driver_sql("DELETE FROM temp.news_ids")
+    conn.exec_driver_sql(f"INSERT OR IGNORE INTO temp.news_ids (id) {select_sql}", params)
+
+
+def _backfill_news_tickers() -> None:
+    """Populate newsticker from tickers_json for rows saved by older versions."""
+    with get_engine().begin() as conn:
+        conn.execute(text(
+            "INSERT OR IGNORE INTO newsticker (news_id, ticker)"
+            " SELECT n.id, j.value FROM news AS n, json_each(n.tickers_json) AS j"
+            " WHERE json_valid(n.tickers_json) AND j.value IS NOT NULL"
+        ))
+
+
+# Bucket start per rollup granularity, in SQLAlchemy's SQLite DateTime text format
+ROLLUP_BUCKETS: Dict[str, str] = {
+    "hour": "strftime('%Y-%m-%d %H:00:00.000000', COALESCE(n.published, n.snapshot_time))",
+    "day": "strftime('%Y-%m-%d 00:00:00.000000', COALESCE(n.published, n.snapshot_time))",
+}
+
+
+def _roll_up(conn, sign: int, staged: bool = False) -> None:
+    """
+    Add (sign=+1) or subtract (sign=-1) the contribution of scored headlines
+    to SentimentRollup: all of News, or only the ids in temp.news_ids if ``staged``.
+    Stories whose link was archived are skipped (already counted before archiving).
+    """
+    join = " JOIN temp.news_ids AS s ON s.id = n.id" if staged else ""
+    for bucket, start in ROLLUP_BUCKETS.items():
+        conn.exec_driver_sql(
+            "INSERT INTO sentimentrollup"
+            " (ticker, bucket, bucket_start, headlines, score_sum, positive, negative, neutral)"
+            f" SELECT t.ticker, '{bucket}', {start},"
+            f" {sign} * COUNT(*), {sign} * SUM(n.sentiment_score),"
+            f" {sign} * SUM(n.sentiment_score >= 0.05), {sign} * SUM(n.sentiment_score <= -0.05),"
+            f" {sign} * SUM(n.sentiment_score > -0.05 AND n.sentiment_score < 0.05)"
+            f" FROM news AS n{join} JOIN newsticker AS t ON t.news_id = n.id"
+            " WHERE n.sentiment_score IS NOT NULL"
+            " AND NOT EXISTS (SELECT 1 FROM archivedlink AS a WHERE a.link = n.link)"
+            " GROUP BY t.ticker, 3"
+            " ON CONFLICT (ticker, bucket, bucket_start) DO UPDATE SET"
+            " headlines = headlines + excluded.headlines,"
+            " score_sum = score_sum + excluded.score_sum,"
+            " positive = positive + excluded.positive,"
+            " negative = negative + excluded.negative,"
+            " neutral = neutral + excluded.neutral"
+        )
+    if sign < 0:
+        conn.exec_driver_sql("DELETE FROM sentimentrollup WHERE headlines <= 0")
 
 
 # ---------- Inserts (snapshots = last 30 rows per run) ----------
-def save_prices_snapshot(df) -> int:
+@timed("db.save_prices_snapshot")
+def save_prices_snapshot(df, limit: Optional[int] = 30) -> int:
     """
-    Insert last 30 rows from the given DataFrame into Prices table.
+    Insert last ``limit`` rows (all rows if None) from the given DataFrame into Prices table.
     Expected cols: ['ticker','last_price','pct_change']
     Returns number of rows inserted.
     """
     if df is None or df.empty:
         return 0
-    snap = df.tail(30).copy()
-    snap["snapshot_time"] = dt.datetime.utcnow()
-    rows = []
-    for r in snap.itertuples(index=False):
-        rows.append(
-            Prices(
-                snapshot_time=snap["snapshot_time"].iloc[0],
-                ticker=str(getattr(r, "ticker", "")),
-                last_price=_to_float(getattr(r, "last_price", None)),
-                pct_change=_to_float(getattr(r, "pct_change", None)),
-            )
-        )
-    with Session(engine) as s:
-        s.add_all(rows)
-        s.commit()
+    import pandas as pd
+
+    snap = df.tail(limit) if limit else df
+    records = pd.DataFrame(
+        {
+            "snapshot_time": dt.datetime.utcnow(),
+            "ticker": snap["ticker"].astype(str) if "ticker" in snap else "",
+            "last_price": pd.to_numeric(snap.get("last_price"), errors="coerce"),
+            "pct_change": pd.to_numeric(snap.get("pct_change"), errors="coerce"),
+        },
+        index=snap.index,
+    )
+    rows = _records(records)
+    # Core executemany: no ORM object per row
+    with get_engine().begin() as conn:
+        conn.execute(insert(Prices.__table__), rows)
     return len(rows)
 
 
-def save_news_snapshot(df) -> int:
+@timed("db.save_news_snapshot")
+def save_news_snapshot(df, limit: Optional[int] = 30) -> int:
     """
-    Insert last 30 rows from the given DataFrame into News table.
+    Upsert last ``limit`` rows (all rows if None) from the given DataFrame into
+    News table (keyed on link, so re-saving a story updates it instead of
+    duplicating it), replace each story's rows in the NewsTicker table and
+    update the SentimentRollup aggregates by the difference.
     Expected cols: ['published','title','link','tickers'] and optionally
     ['sentiment','sentiment_score'].
+    Returns number of rows written.
     """
+    import pandas as pd
+
     if df is None or df.empty:
         return 0
-    snap = df.tail(30).copy()
-    snap["snapshot_time"] = dt.datetime.utcnow()
-    rows = []
-    for r in snap.itertuples(index=False):
-        rows.append(
-            News(
-                snapshot_time=snap["snapshot_time"].iloc[0],
-                published=_to_dt(getattr(r, "published", None)),
-                title=str(getattr(r, "title", "")),
-                link=str(getattr(r, "link", "")),
-                tickers_json=json.dumps(list(getattr(r, "tickers", []) or [])),
-                sentiment=str(getattr(r, "sentiment", "")) if hasattr(r, "sentiment") else None,
-                sentiment_score=_to_float(getattr(r, "sentiment_score", None)) if hasattr(r, "sentiment_score") else None,
+    snap = df.tail(limit) if limit else df
+    if "link" in snap:
+        # Last copy of each linked story wins; linkless stories are all kept
+        has_link = snap["link"].fillna("").astype(str) != ""
+        snap = snap[~(snap["link"].duplicated(keep="last") & has_link)]
+    n = len(snap)
+    tickers = snap["tickers"] if "tickers" in snap else pd.Series([[]] * n, index=snap.index)
+    tickers = tickers.map(lambda ts: list(ts) if hasattr(ts, "__iter__") and not isinstance(ts, str) else [])
+    published = pd.to_datetime(snap["published"], errors="coerce", utc=True) if "published" in snap \
+        else pd.Series(pd.NaT, index=snap.index, dtype="datetime64[ns, UTC]")
+    records = pd.DataFrame(
+        {
+            "snapshot_time": dt.datetime.utcnow(),
+            "published": published.dt.tz_localize(None),
+            "title": snap["title"].fillna("").astype(str) if "title" in snap else "",
+            "link": snap["link"].fillna("").astype(str) if "link" in snap else "",
+            "tickers_json": tickers.map(json.dumps),
+            "sentiment": snap["sentiment"].fillna("").astype(str) if "sentiment" in snap else None,
+            "sentiment_score": pd.to_numeric(snap["sentiment_score"], errors="coerce")
+            if "sentiment_score" in snap else float("nan"),
+        },
+        index=snap.index,
+    )
+    rows = _records(records)
+    links = records["link"].tolist()
+    linked = [i for i, link in enumerate(links) if link]
+    stmt = sqlite_insert(News.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["link"],
+        index_where=text("link <> ''"),
+        set_={
+            c: stmt.excluded[c]
+            for c in ("snapshot_time", "published", "title", "tickers_json", "sentiment", "sentiment_score")
+        },
+    )
+    pairs = pd.DataFrame({"pos": range(n), "ticker": tickers.tolist()}).explode("ticker").dropna()
+    pairs = pairs.assign(ticker=pairs["ticker"].astype(str).str.upper()).drop_duplicates()
+    with get_engine().begin() as conn:
+        ids = [None] * n
+        if linked:
+            conn.exec_driver_sql("CREATE TEMP TABLE IF NOT EXISTS news_links (link TEXT PRIMARY KEY)")
+            conn.exec_driver_sql("DELETE FROM temp.news_links")
+            conn.exec_driver_sql("INSERT OR IGNORE INTO temp.news_links (link) VALUES (?)",
+                                 [(links[i],) for i in linked])
+            # Take re-saved stories out of the rollups and drop their tickers before their rows change
+            _stage_ids(conn, "SELECT n.id FROM news AS n JOIN temp.news_links AS s ON s.link = n.link")
+            _roll_up(conn, -1, staged=True)
+            conn.exec_driver_sql("DELETE FROM newsticker WHERE news_id IN (SELECT id FROM temp.news_ids)")
+            try:
+                conn.execute(stmt, [rows[i] for i in linked])
+            except OperationalError as exc:
+                if "ON CONFLICT" not in str(exc):
+                    raise
+                raise RuntimeError(
+                    "news has no unique link index (older rows share links); "
+                    "run auto_research.db.dedupe_news_links() first"
+                ) from exc
+            by_link = dict(conn.exec_driver_sql(
+                "SELECT s.link, n.id FROM temp.news_links AS s JOIN news AS n ON n.link = s.link"
+            ).all())
+            for i in linked:
+                ids[i] = by_link[links[i]]
+            conn.exec_driver_sql("DROP TABLE temp.news_links")
+        for i, link in enumerate(links):
+            if not link:  # no key to upsert on: always a new row
+                ids[i] = conn.execute(insert(News.__table__), rows[i]).inserted_primary_key[0]
+        if not pairs.empty:
+            conn.exec_driver_sql(
+                "INSERT OR IGNORE INTO newsticker (news_id, ticker) VALUES (?, ?)",
+                [(ids[p], t) for p, t in zip(pairs["pos"], pairs["ticker"])],
             )
-        )
-    with Session(engine) as s:
-        s.add_all(rows)
-        s.commit()
+        _stage_ids(conn, "SELECT value FROM json_each(?)", (json.dumps(ids),))
+        _roll_up(conn, +1, staged=True)
+        conn.exec_driver_sql("DROP TABLE temp.news_ids")
     return len(rows)
 
 
 # ---------- Utils ----------
-def _to_float(x):
-    try:
-        return float(x) if x is not None else None
-    except Exception:
-        return None
-
-def _to_dt(x):
-    if x is None:
-        return None
-    if isinstance(x, dt.datetime):
-        return x
-    try:
-        # best-effort parse (assume pandas Timestamp)
-        return dt.datetime.fromisoformat(str(x).replace("Z", "+00:00")).replace(tzinfo=None)
-    except Exception:
-        return None
+def _records(df: pd.DataFrame) -> list:
+    """DataFrame -> list of row dicts with NaN/NaT as None (for executemany)."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
@@ -0,0 +1,282 @@
+# auto_research/dedup.py
+"""
+Persistent cross-run headline dedup index.
+
+A story is a duplicate if its normalized URL was seen before, or if its title
+simhash is within ``max_distance`` bits of a stored one (catches syndicated
+copies like "Apple beats estimates - Reuters" vs "Apple beats estimates").
+Lookups are dict/set probes: the 64-bit fingerprint is split into 4 bands of
+16 bits, and any two fingerprints within 3 bits share at least one band exactly.
+Keys not seen for ``max_age`` seconds age out.
+
+    index = default_dedup_index()
+    for item in pipeline(iter_headlines(), index.filter, tag_tickers(m), save_to_db(), index.record):
+        ...
+
+``filter`` drops repeats (refreshing the age of the keys they matched, so a
+story that stays in a feed stays deduplicated) and never indexes new stories;
+``record`` marks stories seen. Put ``record`` after the stage that persists
+them, so a run that fails midway doesn't mark unsaved stories as seen (they
+are picked up again on the next poll).
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse, urlunparse
+
+# Index file lives next to the main DB at repo root, e.g., ./dedup_index.db
+ROOT = Path(__file__).resolve().parents[1]
+DEDUP_INDEX_PATH = ROOT / "dedup_index.db"
+
+DEFAULT_MAX_AGE = 7 * 24 * 3600  # seconds a key survives without being seen again
+DEFAULT_MAX_DISTANCE = 3         # simhash bits; must be < _BANDS for the band lookup to be exact
+MIN_TITLE_TOKENS = 4             # shorter titles only match on an identical fingerprint
+
+_BANDS = 4
+_BAND_BITS = 64 // _BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+_TOKEN = re.compile(r"[a-z0-9]+")
+# Trailing publisher tag on syndicated headlines: "... - Reuters", "... | CNBC"
+_SOURCE_SUFFIX = re.compile(r"\s+[-|–—]\s+[^-|–—]{2,40}$")
+
+
+# ---------- Keys ----------
+def url_key(link: str) -> str:
+    """Normalized URL (expects tracking params already stripped by ``news._clean_url``)."""
+    try:
+        p = urlparse((link or "").strip())
+        path = p.path.rstrip("/") or "/"
+        return urlunparse(("", p.netloc.lower().removeprefix("www."), path, p.params, p.query, ""))
+    except Exception:
+        return (link or "").strip()
+
+
+def title_tokens(title: str) -> List[str]:
+    return _TOKEN.findall(_SOURCE_SUFFIX.sub("", (title or "").strip()).lower())
+
+
+def simhash(tokens: Iterable[str]) -> int:
+    """64-bit simhash over unigrams and bigrams."""
+    tokens = list(tokens)
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    weights = [0] * 64
+    for f in features:
+        h = int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def _bands(fp: int) -> List[int]:
+    return [(fp >> (i * _BAND_BITS)) & _BAND_MASK for i in range(_BANDS)]
+
+
+class DedupIndex:
+    """
+    URL + title-fingerprint index kept in memory for O(1) checks and written
+    through to SQLite so it survives restarts. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_age: float = DEFAULT_MAX_AGE,
+        max_distance: int = DEFAULT_MAX_DISTANCE,
+    ):
+        if max_distance >= _BANDS:
+            raise ValueError(f"max_distance must be < {_BANDS}")
+        self.path = Path(path) if path else DEDUP_INDEX_PATH
+        self.max_age = max_age
+        self.max_distance = max_distance
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._urls: Dict[str, float] = {}
+        self._fps: Dict[int, float] = {}
+        self._band_index: List[Dict[int, Set[int]]] = [{} for _ in range(_BANDS)]
+        self._dirty: Dict[Tuple[str, str], float] = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS dedup_keys ("
+            " kind TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " last_seen REAL NOT NULL,"
+            " PRIMARY KEY (kind, key))"
+        )
+        self._conn.commit()
+        self._load()
+
+    def _load(self) -> None:
+        cutoff = time.time() - self.max_age if self.max_age else 0
+        with self._lock:
+            self._conn.execute("DELETE FROM dedup_keys WHERE last_seen < ?", (cutoff,))
+            self._conn.commit()
+            for kind, key, seen in self._conn.execute("SELECT kind, key, last_seen FROM dedup_keys"):
+                if kind == "url":
+                    self._urls[key] = seen
+                else:
+                    self._index_fp(int(key, 16), seen)
+
+    # ---------- Memory index ----------
+    def _index_fp(self, fp: int, seen: float) -> None:
+        self._fps[fp] = seen
+        for i, b in enumerate(_bands(fp)):
+            self._band_index[i].setdefault(b, set()).add(fp)
+
+    def _near(self, fp: int, exact_only: bool) -> Optional[int]:
+        if fp in self._fps:
+            return fp
+        if exact_only:
+            return None
+        for i, b in enumerate(_bands(fp)):
+            for other in self._band_index[i].get(b, ()):
+                if bin(fp ^ other).count("1") <= self.max_distance:
+                    return other
+        return None
+
+    def _lookup(self, link: str, title: str) -> Tuple[str, Optional[int], bool]:
+        ukey = url_key(link)
+        tokens = title_tokens(title)
+        fp = simhash(tokens) if tokens else None
+        dup = bool(ukey) and ukey in self._urls
+        if fp is not None:
+            match = self._near(fp, exact_only=len(tokens) < MIN_TITLE_TOKENS)
+            if match is not None:
+                dup, fp = True, match
+        return ukey, fp, dup
+
+    # ---------- Public API ----------
+    def seen(self, link: str, title: str) -> bool:
+        """True if the story (or a near-identical title) is already indexed. Does not record it."""
+        with self._lock:
+            return self._lookup(link, title)[2]
+
+    def add(self, link: str, title: str) -> bool:
+        """
+        Record a story and return True if it was new. A repeat refreshes its
+        keys' age, so a story that stays in a feed stays deduplicated.
+        """
+        now = time.time()
+        with self._lock:
+            ukey, fp, dup = self._lookup(link, title)
+            if ukey:
+                self._urls[ukey] = now
+                self._dirty[("url", ukey)] = now
+            if fp is not None:
+                self._index_fp(fp, now)
+                self._dirty[("title", format(fp, "016x"))] = now
+            if dup:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return not dup
+
+    def _refresh_if_seen(self, link: str, title: str) -> bool:
+        """Like ``seen``, but a repeat refreshes the age of the keys it matched."""
+        now = time.time()
+        with self._lock:
+            ukey, fp, dup = self._lookup(link, title)
+            if not dup:
+                return False
+            if ukey in self._urls:
+                self._urls[ukey] = now
+                self._dirty[("url", ukey)] = now
+            if fp is not None and fp in self._fps:
+                self._index_fp(fp, now)
+                self._dirty[("title", format(fp, "016x"))] = now
+            self.hits += 1
+            return True
+
+    def filter(self, items: Iterable[dict]) -> Iterator[dict]:
+        """
+        Pipeline stage: pass through only items whose link/title are not indexed
+        yet. Repeats refresh their keys' age (they were stored on an earlier
+        run); new items are not recorded.
+        """
+        try:
+            for item in items:
+                if not self._refresh_if_seen(item.get("link", ""), item.get("title", "")):
+                    yield item
+        finally:
+            self.flush()
+
+    def record(self, items: Iterable[dict], flush_every: int = 100) -> Iterator[dict]:
+        """
+        Pipeline stage: record items as seen and pass them through. Place it
+        after the saving stage so only stored stories get recorded.
+        """
+        try:
+            for n, item in enumerate(items, 1):
+                self.add(item.get("link", ""), item.get("title", ""))
+                yield item
+                if n % flush_every == 0:
+                    self.flush()
+        finally:
+            # Everything that reached this stage was already saved upstream
+            self.flush()
+
+    def flush(self) -> None:
+        """Write pending key timestamps to SQLite."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO dedup_keys (kind, key, last_seen) VALUES (?, ?, ?)",
+                [(kind, key, seen) for (kind, key), seen in self._dirty.items()],
+            )
+            self._conn.commit()
+            self._dirty.clear()
+
+    def prune(self) -> int:
+        """Drop keys not seen within ``max_age``. Returns the number of keys removed."""
+        if not self.max_age:
+            return 0
+        self.flush()
+        cutoff = time.time() - self.max_age
+        with self._lock:
+            old_urls = [k for k, seen in self._urls.items() if seen < cutoff]
+            old_fps = [fp for fp, seen in self._fps.items() if seen < cutoff]
+            for k in old_urls:
+                del self._urls[k]
+            for fp in old_fps:
+                del self._fps[fp]
+                for i, b in enumerate(_bands(fp)):
+                    bucket = self._band_index[i].get(b)
+                    if bucket is not None:
+                        bucket.discard(fp)
+                        if not bucket:
+                            del self._band_index[i][b]
+            self._conn.execute("DELETE FROM dedup_keys WHERE last_seen < ?", (cutoff,))
+            self._conn.commit()
+        return len(old_urls) + len(old_fps)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._urls.clear()
+            self._fps.clear()
+            self._band_index = [{} for _ in range(_BANDS)]
+            self._dirty.clear()
+            self._conn.execute("DELETE FROM dedup_keys")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        return len(self._urls) + len(self._fps)
+
+
+_default_index: Optional[DedupIndex] = None
+_default_lock = threading.Lock()
+
+
+def default_dedup_index() -> DedupIndex:
+    """Process-wide index backed by DEDUP_INDEX_PATH, created on first use."""
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            _default_index = DedupIndex()
+        return _default_index
@@ -0,0 +1,169 @@
+# auto_research/feed_cache.py
+from __future__ import annotations
+from typing import Optional
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+# Cache file lives next to the main DB at repo root, e.g., ./feed_cache.db
+ROOT = Path(__file__).resolve().parents[1]
+FEED_CACHE_PATH = ROOT / "feed_cache.db"
+
+log = logging.getLogger("auto_research.feed_cache")
+
+# Plain-data parts of a feedparser result worth caching. bozo_exception (may hold
+# an unpicklable SAX parser state) and response headers are deliberately left out.
+_CACHED_KEYS = ("feed", "entries", "status", "etag", "modified", "version", "encoding")
+
+DEFAULT_TTL = 7 * 24 * 3600  # seconds an entry survives without being revalidated
+DEFAULT_MAX_ENTRIES = 256
+
+
+class FeedCache:
+    """
+    Persistent per-URL feed cache for conditional GETs.
+
+    Stores the ETag / Last-Modified validators plus the parsed feed, so a 304
+    response can reuse the cached parse instead of re-downloading and
+    re-parsing. Entries older than ``ttl`` are dropped, and the store is
+    capped at ``max_entries`` (least recently used evicted first).
+    ``fresh_for`` (seconds) lets a recent entry be served with no request at all.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        fresh_for: float = 0.0,
+    ):
+        self.path = Path(path) if path else FEED_CACHE_PATH
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.fresh_for = fresh_for
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS feed_cache ("
+            " url TEXT PRIMARY KEY,"
+            " etag TEXT,"
+            " modified TEXT,"
+            " parsed BLOB NOT NULL,"
+            " validated_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    # ---------- Lookups ----------
+    def get(self, url: str) -> Optional[dict]:
+        """Return ``{"etag", "modified", "parsed", "validated_at"}`` or None if missing/expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, modified, parsed, validated_at FROM feed_cache WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self.ttl and now - row[3] > self.ttl:
+                self._conn.execute("DELETE FROM feed_cache WHERE url = ?", (url,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE feed_cache SET last_used = ? WHERE url = ?", (now, url))
+            self._conn.commit()
+        try:
+            parsed = pickle.loads(row[2])
+        except Exception:
+            return None
+        return {"etag": row[0], "modified": row[1], "parsed": parsed, "validated_at": row[3]}
+
+    def is_fresh(self, hit: Optional[dict]) -> bool:
+        return bool(hit) and self.fresh_for > 0 and time.time() - hit["validated_at"] < self.fresh_for
+
+    def request_headers(self, hit: Optional[dict]) -> dict:
+        """Conditional GET headers for a cache hit."""
+        headers = {}
+        if hit and hit.get("etag"):
+            headers["If-None-Match"] = hit["etag"]
+        if hit and hit.get("modified"):
+            headers["If-Modified-Since"] = hit["modified"]
+        return headers
+
+    # ---------- Writes ----------
+    def put(self, url: str, parsed, etag: Optional[str] = None, modified: Optional[str] = None) -> None:
+        """
+        Store the plain-data parts of a fresh parse with its validators, then
+        enforce TTL/size bounds. A parse that still can't be serialized is
+        logged and skipped; caching never fails the fetch.
+        """
+        now = time.time()
+        data = {k: parsed[k] for k in _CACHED_KEYS if k in parsed}
+        try:
+            blob = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as exc:
+            log.warning("feed cache: not caching %s: %s", url, exc)
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO feed_cache (url, etag, modified, parsed, validated_at, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, modified, blob, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def touch(self, url: str) -> None:
+        """Mark an entry as revalidated (after a 304)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE feed_cache SET validated_at = ?, last_used = ? WHERE url = ?", (now, now, url)
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM feed_cache")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM feed_cache").fetchone()[0]
+
+    def _evict(self, now: float) -> None:
+        if self.ttl:
+            self._conn.execute("DELETE FROM feed_cache WHERE validated_at < ?", (now - self.ttl,))
+        if self.max_entries:
+            self._conn.execute(
+                "DELETE FROM feed_cache WHERE url NOT IN"
+                " (SELECT url FROM feed_cache ORDER BY last_used DESC LIMIT ?)",
+                (int(self.max_entries),),
+            )
+
+
+def cached_parse(hit: dict, status: int = 304):
+    """Rebuild a feedparser result from a cache hit, flagged with the given status."""
+    parsed = hit["parsed"]
+    import feedparser
+
+    if not isinstance(parsed, feedparser.FeedParserDict):
+        parsed = feedparser.FeedParserDict(parsed)
+    parsed["status"] = status
+    return parsed
+
+
+_default_cache: Optional[FeedCache] = None
+_default_lock = threading.Lock()
+
+
+def default_feed_cache() -> FeedCache:
+    """Process-wide cache at FEED_CACHE_PATH, created on first use."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = FeedCache()
+        return _default_cache
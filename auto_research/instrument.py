@@ -0,0 +1,203 @@
+# auto_research/instrument.py
+"""
+Lightweight timing spans and counters for the hot paths.
+
+    from auto_research.instrument import count, span, timed
+
+    @timed("news.fetch")
+    def _fetch(...): ...
+
+    with span("prices.download"):
+        ...
+    count("feed_cache.hit")
+
+Disabled by default (``INSTRUMENT=1`` in .env or ``enable()`` turns it on).
+When disabled, ``span`` returns a shared no-op context, ``timed`` wrappers
+do a single flag check, and ``count`` returns immediately.
+
+``snapshot()`` gives per-stage latency percentiles, ``hit_rates()`` the
+``<name>.hit`` / ``<name>.miss`` counter ratios. ``use_opentelemetry()``
+additionally emits every span to an OpenTelemetry tracer.
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING, Callable, Dict
+import functools
+import threading
+import time
+from collections import defaultdict, deque
+
+from auto_research.config import _get_env
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_SAMPLES = 2048  # most recent durations kept per stage for percentiles
+
+_enabled = _get_env("INSTRUMENT", "").lower() in ("1", "true", "yes", "on")
+_lock = threading.Lock()
+_samples: Dict[str, deque] = {}
+_calls: Dict[str, int] = defaultdict(int)
+_errors: Dict[str, int] = defaultdict(int)
+_totals: Dict[str, float] = defaultdict(float)
+_counters: Dict[str, int] = defaultdict(int)
+_tracer = None
+
+
+def enable(flag: bool = True) -> None:
+    global _enabled
+    _enabled = bool(flag)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _record(name: str, seconds: float, failed: bool) -> None:
+    with _lock:
+        buf = _samples.get(name)
+        if buf is None:
+            buf = _samples[name] = deque(maxlen=DEFAULT_SAMPLES)
+        buf.append(seconds)
+        _calls[name] += 1
+        _totals[name] += seconds
+        if failed:
+            _errors[name] += 1
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("name", "_t0", "_otel")
+
+    def __init__(self, name: str):
+        self.name = name
+        self._otel = None
+
+    def __enter__(self):
+        if _tracer is not None:
+            self._otel = _tracer.start_as_current_span(self.name)
+            self._otel.__enter__()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _record(self.name, time.perf_counter() - self._t0, exc_type is not None)
+        if self._otel is not None:
+            self._otel.__exit__(exc_type, exc, tb)
+        return False
+
+
+def span(name: str):
+    """Context manager timing the enclosed block under ``name``."""
+    return _Span(name) if _enabled else _NOOP
+
+
+def timed(name: str) -> Callable:
+    """Decorator timing every call of the function under ``name``."""
+
+    def decorate(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def count(name: str, n: int = 1) -> None:
+    """Increment counter ``name`` (use ``<cache>.hit`` / ``<cache>.miss`` pairs for hit rates)."""
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] += n
+
+
+# ---------- Reporting ----------
+def snapshot() -> pd.DataFrame:
+    """
+    One row per stage: calls, errors, total_s, and p50/p90/p99/max in
+    milliseconds over the most recent DEFAULT_SAMPLES durations.
+    """
+    import numpy as np
+    import pandas as pd
+
+    with _lock:
+        stages = {name: np.fromiter(buf, dtype=float) for name, buf in _samples.items()}
+        calls, errors, totals = dict(_calls), dict(_errors), dict(_totals)
+    rows = []
+    for name, arr in sorted(stages.items()):
+        p50, p90, p99 = np.percentile(arr, [50, 90, 99]) * 1e3 if arr.size else (np.nan,) * 3
+        rows.append({
+            "stage": name,
+            "calls": calls.get(name, 0),
+            "errors": errors.get(name, 0),
+            "total_s": round(totals.get(name, 0.0), 4),
+            "p50_ms": round(p50, 3),
+            "p90_ms": round(p90, 3),
+            "p99_ms": round(p99, 3),
+            "max_ms": round(arr.max() * 1e3, 3) if arr.size else np.nan,
+        })
+    return pd.DataFrame(rows, columns=["stage", "calls", "errors", "total_s", "p50_ms", "p90_ms", "p99_ms", "max_ms"])
+
+
+def counters() -> Dict[str, int]:
+    with _lock:
+        return dict(_counters)
+
+
+def hit_rates() -> pd.DataFrame:
+    """Hit/miss totals and hit rate for every ``<name>.hit`` / ``<name>.miss`` counter pair."""
+    import pandas as pd
+
+    c = counters()
+    names = sorted({k.rsplit(".", 1)[0] for k in c if k.endswith((".hit", ".miss"))})
+    rows = []
+    for name in names:
+        hits, misses = c.get(f"{name}.hit", 0), c.get(f"{name}.miss", 0)
+        total = hits + misses
+        rows.append({"cache": name, "hits": hits, "misses": misses,
+                     "hit_rate": round(hits / total, 4) if total else float("nan")})
+    return pd.DataFrame(rows, columns=["cache", "hits", "misses", "hit_rate"])
+
+
+def reset() -> None:
+    with _lock:
+        _samples.clear()
+        _calls.clear()
+        _errors.clear()
+        _totals.clear()
+        _counters.clear()
+
+
+def use_opentelemetry(tracer_provider=None, name: str = "auto_research") -> None:
+    """
+    Also emit every span to OpenTelemetry (exporters are configured on the
+    provider as usual). Requires ``opentelemetry-api``. Enables instrumentation.
+    """
+    global _tracer
+    try:
+        from opentelemetry import trace
+    except ImportError as exc:  # optional dependency
+        raise RuntimeError("OpenTelemetry export needs opentelemetry-api (and an SDK/exporter).") from exc
+    _tracer = trace.get_tracer(name, tracer_provider=tracer_provider)
+    enable(True)
+
+
+def disable_opentelemetry() -> None:
+    global _tracer
+    _tracer = None
@@ -1,17 +1,106 @@
 # auto_research/macro.py
 from __future__ import annotations
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, Optional, Tuple
 import datetime as dt
-import requests
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from auto_research.config import FRED_API_KEY
+from auto_research.instrument import count, timed
+from auto_research.db import MacroObservation, MacroSeries, get_engine, ensure_db
 
 _FRED_SERIES_URL = "https://api.stlouisfed.org/fred/series/observations"
 
+# Skip the network entirely if a series was refreshed this recently
+DEFAULT_MAX_AGE = dt.timedelta(hours=1)
+
+# FRED allows 120 requests/minute per API key; stay a bit under it
+FRED_RATE_PER_SEC = 1.8
+FRED_BURST = 10
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_RETRIES = 4
+DEFAULT_BACKOFF = 1.0  # seconds; doubles each retry (+ jitter)
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``acquire()`` blocks until a request may be sent."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_limiter = TokenBucket(FRED_RATE_PER_SEC, FRED_BURST)
+_session = None  # requests.Session, created (and requests imported) on first use
+_session_lock = threading.Lock()
+
+
+def _http():
+    """Shared pooled session so FRED requests reuse connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            _session = requests.Session()
+            _session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+            _session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+        return _session
+
+
+def _get_with_retry(params: dict, retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF):
+    """
+    Rate-limited GET; 429/5xx and connection errors are retried with jittered exponential backoff.
+    A server Retry-After is honoured up to the backoff ceiling (``backoff * 2**retries``).
+    """
+    import requests
+
+    ceiling = backoff * (2 ** retries)
+
+    for attempt in range(retries + 1):
+        _limiter.acquire()
+        try:
+            r = _http().get(_FRED_SERIES_URL, params=params, timeout=20)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+        else:
+            if r.status_code not in _RETRY_STATUS or attempt == retries:
+                r.raise_for_status()
+                return r
+            retry_after = r.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                time.sleep(min(float(retry_after), ceiling))
+                continue
+        time.sleep(backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+@timed("macro.fred_request")
 def _fred_request(series_id: str, start: str = "2000-01-01", end: Optional[str] = None) -> pd.DataFrame:
     """
-    Fetch a single FRED series as a DataFrame with columns: date (datetime64[ns]), value (float).
+    Fetch a single FRED series as a DataFrame with columns: date (datetime64[ns]), value (float),
+    realtime_start (datetime64[ns], the vintage of each value).
     Missing values are coerced to NaN. Dates are naive (UTC-like).
     """
     if not FRED_API_KEY:
@@ -26,33 +115,176 @@ def _fred_request(series_id: str, start: str = "2000-01-01", end: Optional[str]
     if end:
         params["observation_end"] = end
 
-    r = requests.get(_FRED_SERIES_URL, params=params, timeout=20)
-    r.raise_for_status()
+    r = _get_with_retry(params)
     data = r.json().get("observations", [])
 
     if not data:
-        return pd.DataFrame(columns=["date", "value"])
+        return pd.DataFrame(columns=["date", "value", "realtime_start"])
 
-    df = pd.DataFrame(data)[["date", "value"]].copy()
+    df = pd.DataFrame(data)
+    if "realtime_start" not in df.columns:
+        df["realtime_start"] = None
+    df = df[["date", "value", "realtime_start"]].copy()
     df["date"] = pd.to_datetime(df["date"], utc=False)
+    df["realtime_start"] = pd.to_datetime(df["realtime_start"], errors="coerce")
     # FRED uses "." for missing; coerce to float
     df["value"] = pd.to_numeric(df["value"].replace(".", pd.NA), errors="coerce")
     return df
 
+
+# ---------- Local series store ----------
+_store_lock = threading.Lock()  # one writer at a time; fetches still run in parallel
+
+
+def _merge_observations(series_id: str, df: pd.DataFrame, obs_start: dt.date) -> None:
+    """Upsert fetched rows into MacroObservation and update the series bookkeeping."""
+    rows = [
+        {
+            "series_id": series_id,
+            "date": d.date(),
+            "value": None if pd.isna(v) else float(v),
+            "realtime_start": None if pd.isna(rs) else rs.date(),
+        }
+        for d, v, rs in zip(df["date"], df["value"], df["realtime_start"])
+    ]
+    with get_engine().begin() as conn:
+        meta = conn.execute(select(MacroSeries).where(MacroSeries.series_id == series_id)).first()
+        if rows:
+            stmt = sqlite_insert(MacroObservation.__table__)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["series_id", "date"],
+                set_={"value": stmt.excluded.value, "realtime_start": stmt.excluded.realtime_start},
+            )
+            conn.execute(stmt, rows)
+
+        last_date = max((r["date"] for r in rows), default=None)
+        vintage = max((r["realtime_start"] for r in rows if r["realtime_start"]), default=None)
+        if meta is not None:
+            obs_start = min(obs_start, meta.obs_start)
+            last_date = max(filter(None, [last_date, meta.last_date]), default=None)
+            vintage = max(filter(None, [vintage, meta.vintage]), default=None)
+        stmt = sqlite_insert(MacroSeries.__table__).values(
+            series_id=series_id,
+            obs_start=obs_start,
+            last_date=last_date,
+            vintage=vintage,
+            refreshed_at=dt.datetime.utcnow(),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["series_id"],
+            set_={c: stmt.excluded[c] for c in ("obs_start", "last_date", "vintage", "refreshed_at")},
+        )
+        conn.execute(stmt)
+
+
+def refresh_series(series_id: str,
+                   start: str = "2000-01-01",
+                   max_age: Optional[dt.timedelta] = DEFAULT_MAX_AGE) -> int:
+    """
+    Bring the local copy of one series up to date and return the number of rows fetched.
+
+    Only observations from the last stored date onward are requested (the last
+    date is re-fetched so a revised value replaces the stored one). If ``start``
+    is earlier than anything stored, the series is backfilled from ``start``.
+    Series refreshed within ``max_age`` are not requested at all.
+    """
+    ensure_db()
+    start_d = dt.date.fromisoformat(start)
+    with get_engine().connect() as conn:
+        meta = conn.execute(select(MacroSeries).where(MacroSeries.series_id == series_id)).first()
+
+    if meta is not None and start_d >= meta.obs_start:
+        if max_age is not None and dt.datetime.utcnow() - meta.refreshed_at < max_age:
+            count("macro_store.hit")
+            return 0
+        fetch_from = meta.last_date or start_d
+    else:
+        fetch_from = start_d
+
+    count("macro_store.miss")
+    df = _fred_request(series_id, start=fetch_from.isoformat())
+    with _store_lock:
+        _merge_observations(series_id, df, obs_start=min(start_d, meta.obs_start) if meta else start_d)
+    return len(df)
+
+
+def refresh_many(series_ids: Iterable[str],
+                 start: str = "2000-01-01",
+                 max_age: Optional[dt.timedelta] = DEFAULT_MAX_AGE,
+                 max_workers: int = DEFAULT_MAX_WORKERS) -> Dict[str, Optional[str]]:
+    """
+    Refresh several series in parallel (shared session + rate limiter).
+    Returns ``{series_id: error message or None}``; one failure never aborts the others.
+    """
+    ids = list(dict.fromkeys(series_ids))
+    if not ids:
+        return {}
+    ensure_db()
+
+    def _one(sid: str) -> Tuple[str, Optional[str]]:
+        try:
+            refresh_series(sid, start=start, max_age=max_age)
+            return sid, None
+        except Exception as exc:
+            return sid, f"{type(exc).__name__}: {exc}"
+
+    workers = max(1, min(int(max_workers), len(ids)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fred") as pool:
+        return dict(pool.map(_one, ids))
+
+
+def load_series(series_ids: Iterable[str],
+                start: str = "2000-01-01",
+                end: Optional[str] = None) -> pd.DataFrame:
+    """Build the wide date x series frame from the local store only (no network)."""
+    ensure_db()
+    ids = list(series_ids)
+    q = select(MacroObservation.series_id, MacroObservation.date, MacroObservation.value).where(
+        MacroObservation.series_id.in_(ids),
+        MacroObservation.date >= dt.date.fromisoformat(start),
+    )
+    if end:
+        q = q.where(MacroObservation.date <= dt.date.fromisoformat(end))
+    with get_engine().connect() as conn:
+        long = pd.read_sql(q, conn)
+    if long.empty:
+        return pd.DataFrame(columns=ids)
+    long["date"] = pd.to_datetime(long["date"])
+    out = long.pivot(index="date", columns="series_id", values="value")
+    out = out[[sid for sid in ids if sid in out.columns]].sort_index()
+    out.columns.name = None
+    return out
+
+
 def macro_dataframe(series_ids: Iterable[str] = ("TOTALSA", "INDPRO"),
                     start: str = "2000-01-01",
-                    end: Optional[str] = None) -> pd.DataFrame:
+                    end: Optional[str] = None,
+                    max_age: Optional[dt.timedelta] = DEFAULT_MAX_AGE,
+                    max_workers: int = DEFAULT_MAX_WORKERS,
+                    with_errors: bool = False):
     """
     Fetch multiple FRED series and return a *wide* DataFrame indexed by date,
     with one column per series_id.
+
+    Series are refreshed incrementally and in parallel into the local store
+    (see :func:`refresh_many`) and the frame is built from local data. If a
+    refresh fails (rate limit, network) but the series is stored locally,
+    the stored data is used; series with neither are left out. Only when no
+    requested series is available at all is the first error raised.
+
+    With ``with_errors=True`` returns ``(df, errors)`` where ``errors`` maps
+    series_id -> error message for the series whose refresh failed.
     """
-    frames: List[pd.DataFrame] = []
-    for sid in series_ids:
-        df = _fred_request(sid, start=start, end=end)
-        if not df.empty:
-            df = df.rename(columns={"value": sid}).set_index("date")
-            frames.append(df[[sid]])
-    if not frames:
-        return pd.DataFrame(columns=list(series_ids))
-    out = pd.concat(frames, axis=1).sort_index()
-    return out
+    ids = list(series_ids)
+    errors = {sid: err for sid, err in refresh_many(ids, start=start, max_age=max_age,
+                                                    max_workers=max_workers).items() if err}
+    if errors and all(sid in errors and not _has_local(sid) for sid in ids):
+        raise RuntimeError(errors[ids[0]])
+    out = load_series(ids, start=start, end=end)
+    return (out, errors) if with_errors else out
+
+
+def _has_local(series_id: str) -> bool:
+    ensure_db()
+    with get_engine().connect() as conn:
+        return conn.execute(select(MacroSeries.series_id).where(MacroSeries.series_id == series_id)).first() is not None
@@ -0,0 +1,115 @@
+# auto_research/matcher.py
+from __future__ import annotations
+from typing import Dict, Iterable, List, Tuple
+import re
+from collections import OrderedDict
+import threading
+
+_WORD = re.compile(r"\w")
+_CACHE_SIZE = 16
+_cache: "OrderedDict[Tuple, KeywordMatcher]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _is_word(ch: str) -> bool:
+    return bool(_WORD.match(ch))
+
+
+def _trie_regex(node: dict) -> str:
+    """Render a char trie as a regex; optional suffixes are greedy so the longest keyword wins."""
+    branches = [re.escape(ch) + _trie_regex(child) for ch, child in sorted(node.items()) if ch != ""]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        return (body if len(branches) > 1 else "(?:" + body + ")") + "?"
+    return body
+
+
+class KeywordMatcher:
+    """
+    Prebuilt ticker matcher: finds every ticker whose keywords occur in a text
+    (case-insensitive, word-boundary) in a single regex pass.
+
+    All keywords are folded into one trie-shaped pattern. At each position the
+    longest keyword is captured; shorter keywords that are prefixes of it are
+    then checked for a trailing word boundary, so results are identical to
+    testing every ``\\bkeyword\\b`` separately.
+    """
+
+    def __init__(self, ticker_map: Dict[str, Iterable[str]]):
+        self._owners: Dict[str, set] = {}   # keyword -> tickers
+        self._always: set = set()           # tickers with an empty keyword
+        trie: dict = {}
+        for ticker, keywords in ticker_map.items():
+            for kw in keywords:
+                kw_l = str(kw).lower()
+                if not kw_l:
+                    self._always.add(ticker.upper())
+                    continue
+                self._owners.setdefault(kw_l, set()).add(ticker.upper())
+                node = trie
+                for ch in kw_l:
+                    node = node.setdefault(ch, {})
+                node[""] = True
+        self._trie = trie
+        self._prefixes: Dict[str, List[str]] = {kw: self._prefixes_of(kw) for kw in self._owners}
+        body = _trie_regex(trie)
+        self._pattern = re.compile(rf"(?=\b({body})\b)") if body else None
+
+    def _prefixes_of(self, kw: str) -> List[str]:
+        """Shorter keywords that are prefixes of ``kw`` (walks the trie once)."""
+        out: List[str] = []
+        node = self._trie
+        for i, ch in enumerate(kw[:-1]):
+            node = node[ch]
+            if "" in node:
+                out.append(kw[: i + 1])
+        return out
+
+    def match(self, text: str) -> List[str]:
+        """Return sorted tickers whose keyword list matches the text."""
+        text_l = (text or "").lower()
+        hits = set()
+        if self._always and re.search(r"\b", text_l):
+            hits |= self._always
+        if self._pattern is None:
+            return sorted(hits)
+        n = len(text_l)
+        for m in self._pattern.finditer(text_l):
+            kw = m.group(1)
+            hits |= self._owners[kw]
+            start = m.start()
+            for p in self._prefixes[kw]:
+                end = start + len(p)
+                # \b at `end`: word-ness changes between the two neighbouring chars
+                before = _is_word(text_l[end - 1])
+                after = _is_word(text_l[end]) if end < n else False
+                if before != after:
+                    hits |= self._owners[p]
+        return sorted(hits)
+
+
+def _normalize(ticker_map: Dict[str, Iterable[str]]) -> Dict[str, Tuple[str, ...]]:
+    # Keyword iterables are read exactly once (generators included)
+    return {str(t): tuple(str(k) for k in kws) for t, kws in ticker_map.items()}
+
+
+def compile_ticker_map(ticker_map: Dict[str, Iterable[str]]) -> KeywordMatcher:
+    """
+    Return a (cached) KeywordMatcher for the map; rebuilt only when the map contents change.
+    Building the cache key is O(map size), so hot loops should hold on to the matcher.
+    """
+    normalized = _normalize(ticker_map)
+    key = tuple(sorted(normalized.items()))
+    with _cache_lock:
+        matcher = _cache.get(key)
+        if matcher is not None:
+            _cache.move_to_end(key)
+            return matcher
+    matcher = KeywordMatcher(normalized)
+    with _cache_lock:
+        _cache[key] = matcher
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return matcher
@@ -1,18 +1,29 @@
 # auto_research/news.py
 from __future__ import annotations
-from typing import Dict, Iterable, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import time
+import random
 import re
+import email.utils
+import functools
+import hashlib
+import logging
 import datetime as dt
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
 
-import feedparser
-feedparser.USER_AGENT = "AutoResearch/0.1 (+https://github.com/Nkokubu/auto-research)"
 import pandas as pd
-from dateutil import parser as dtparse
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-_analyzer = SentimentIntensityAnalyzer()
+from auto_research.feed_cache import FeedCache, cached_parse, default_feed_cache
+from auto_research.instrument import count, span, timed
+from auto_research.matcher import compile_ticker_map
+from auto_research.sentiment import SentimentEngine, default_engine
 
 
+log = logging.getLogger("auto_research.news")
+
+USER_AGENT = "AutoResearch/0.1 (+https://github.com/Nkokubu/auto-research)"
+
 # Sensible defaults (you can pass your own feed list to the function too)
 DEFAULT_FEEDS = {
     "reuters_top": "https://feeds.reuters.com/reuters/topNews",
@@ -22,6 +33,15 @@ DEFAULT_FEEDS = {
     "ap_top": "https://apnews.com/hub/ap-top-news?utm_source=rss",  # alternate RSS-ish URL
 }
 
+# Fetch tuning: feeds are pulled concurrently, each with its own timeout/retries
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_TIMEOUT = 10.0   # seconds per HTTP attempt
+DEFAULT_RETRIES = 1      # extra attempts after the first
+DEFAULT_BACKOFF = 0.5    # seconds; doubles each retry (+ jitter)
+DEFAULT_SEEN_SIZE = 20_000  # dedup keys remembered by a streaming pipeline
+
+_STATS_COLUMNS = ["feed", "ok", "status", "entries", "latency_s", "error"]
+
 
 def _clean_url(url: str) -> str:
     """Strip tracking params like utm_* to reduce duplicate links."""
@@ -33,60 +53,350 @@ def _clean_url(url: str) -> str:
         return url
 
 
-def _parse_published(entry) -> Optional[dt.datetime]:
-    """Parse datetime from common RSS/Atom fields; return naive UTC."""
-    for key in ("published", "updated", "created", "issued"):
-        val = entry.get(key)
-        if val:
-            try:
-                d = dtparse.parse(val)
-                if d.tzinfo:
-                    d = d.astimezone(dt.timezone.utc).replace(tzinfo=None)
-                return d
-            except Exception:
-                pass
+_DATE_FIELDS = ("published", "updated", "created", "issued")
+# "Fri, 05 Jan 2024 20:41:07 GMT" (weekday optional); email.utils is lenient, so gate on shape
+_RFC822 = re.compile(r"^(?:[A-Za-z]{3},?\s+)?\d{1,2}\s+[A-Za-z]{3}\s+\d{2,4}\s+\d{1,2}:\d{2}")
+
+
+def _naive_utc(d: dt.datetime) -> dt.datetime:
+    return d.astimezone(dt.timezone.utc).replace(tzinfo=None) if d.tzinfo else d
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date_string(val: str) -> Optional[dt.datetime]:
+    """RFC 822 (RSS), then ISO 8601 (Atom), then dateutil for anything odd. Memoized."""
+    val = val.strip()
+    if _RFC822.match(val):
+        try:
+            return _naive_utc(email.utils.parsedate_to_datetime(val))
+        except (TypeError, ValueError, IndexError):
+            pass
+    try:
+        return _naive_utc(dt.datetime.fromisoformat(val))
+    except ValueError:
+        pass
+    from dateutil import parser as dtparse
+
+    try:
+        return _naive_utc(dtparse.parse(val))
+    except Exception:
+        return None
 
-    # Fallback to *_parsed tuples
-    for key in ("published_parsed", "updated_parsed"):
-        t = entry.get(key)
+
+@timed("news.parse_published")
+def _parse_published(entry) -> Optional[dt.datetime]:
+    """
+    Parse datetime from common RSS/Atom fields; return naive UTC.
+    Prefers feedparser's ``*_parsed`` UTC tuples, then the raw string.
+    """
+    for key in _DATE_FIELDS:
+        t = entry.get(key + "_parsed")
         if t:
             try:
-                d = dt.datetime(*t[:6], tzinfo=dt.timezone.utc).replace(tzinfo=None)
-                return d
-            except Exception:
+                return dt.datetime(*t[:6])
+            except (TypeError, ValueError):
                 pass
+        val = entry.get(key)
+        if val:
+            d = _parse_date_string(val)
+            if d is not None:
+                return d
     return None
 
 
+@timed("news.match_tickers")
 def _match_tickers(text: str, ticker_map: Dict[str, Iterable[str]]) -> List[str]:
     """Return list of tickers whose keyword list matches the text (word-boundary)."""
-    text_l = text.lower()
-    hits: List[str] = []
-    for ticker, keywords in ticker_map.items():
-        for kw in keywords:
-            if re.search(rf"\b{re.escape(str(kw).lower())}\b", text_l):
-                hits.append(ticker.upper())
-                break
-    return sorted(set(hits))
+    return compile_ticker_map(ticker_map).match(text)
 
 #the fetch helper
-def _fetch(url: str):
-    """Fetch a feed with a defined User-Agent; quick retry if empty."""
-    parsed = feedparser.parse(url, request_headers={"User-Agent": feedparser.USER_AGENT})
-    if not getattr(parsed, "entries", None):
-        # Gentle second attempt
-        parsed = feedparser.parse(url, request_headers={"User-Agent": feedparser.USER_AGENT})
+@timed("news.fetch")
+def _fetch(
+    url: str,
+    timeout: float = DEFAULT_TIMEOUT,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    cache: Optional[FeedCache] = None,
+):
+    """
+    Fetch a feed with a defined User-Agent and a hard per-request timeout.
+    Failed or empty responses are retried with exponential backoff + jitter.
+    With a ``cache``, sends If-None-Match / If-Modified-Since and reuses the
+    cached parse on 304 (or on final failure, rather than returning nothing).
+    Never raises: on final failure returns an empty parse with ``bozo_exception`` set.
+    """
+    hit = cache.get(url) if cache is not None else None
+    if hit and cache.is_fresh(hit):
+        count("feed_cache.hit")
+        return cached_parse(hit, status=200)
+
+    # feedparser/requests are imported on first fetch, not with the module
+    import feedparser
+    import requests
+
+    feedparser.USER_AGENT = USER_AGENT
+    headers = {"User-Agent": USER_AGENT}
+    if hit:
+        headers.update(cache.request_headers(hit))
+
+    parsed = None
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(backoff * (2 ** (attempt - 1)) * (1 + random.random() * 0.25))
+        try:
+            resp = requests.get(url, headers=headers, timeout=timeout)
+            if resp.status_code == 304 and hit:
+                cache.touch(url)
+                count("feed_cache.hit")
+                return cached_parse(hit, status=304)
+            resp.raise_for_status()
+            if cache is not None:
+                count("feed_cache.miss")
+            with span("news.parse_feed"):
+                parsed = feedparser.parse(resp.content, response_headers=dict(resp.headers))
+            parsed["status"] = resp.status_code
+        except Exception as exc:
+            parsed = feedparser.FeedParserDict(entries=[], bozo=1, bozo_exception=exc)
+        if getattr(parsed, "entries", None):
+            if cache is not None:
+                try:
+                    cache.put(
+                        url,
+                        parsed,
+                        etag=resp.headers.get("ETag"),
+                        modified=resp.headers.get("Last-Modified"),
+                    )
+                except Exception:
+                    log.warning("feed cache write failed for %s", url, exc_info=True)
+            break
+    else:
+        if hit:
+            # Stale-if-error: better an older parse than an empty feed
+            return cached_parse(hit, status=getattr(parsed, "status", 0) or 0)
     return parsed
 
 
+def _feed_stat(url: str, parsed, latency: float) -> dict:
+    n = len(getattr(parsed, "entries", []) or [])
+    err = parsed.get("bozo_exception") if n == 0 else None
+    return {
+        "feed": url,
+        "ok": n > 0,
+        "status": parsed.get("status"),
+        "entries": n,
+        "latency_s": round(latency, 4),
+        "error": str(err) if err else None,
+    }
+
+
+def iter_feeds(
+    urls: Iterable[str],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    timeout: float = DEFAULT_TIMEOUT,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    cache: Optional[FeedCache] = None,
+) -> Iterator[Tuple[str, object, dict]]:
+    """
+    Fetch feeds concurrently on a bounded thread pool and yield
+    ``(url, parsed, stat)`` as each one completes (fastest first).
+    """
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return
+
+    def _timed(url: str):
+        t0 = time.perf_counter()
+        parsed = _fetch(url, timeout=timeout, retries=retries, backoff=backoff, cache=cache)
+        return parsed, time.perf_counter() - t0
+
+    workers = max(1, min(int(max_workers), len(urls)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="feed") as pool:
+        futures = {pool.submit(_timed, url): url for url in urls}
+        for fut in as_completed(futures):
+            url = futures[fut]
+            parsed, latency = fut.result()
+            yield url, parsed, _feed_stat(url, parsed, latency)
+
+
+def fetch_feeds(
+    urls: Iterable[str],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    timeout: float = DEFAULT_TIMEOUT,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    cache: Optional[FeedCache] = None,
+) -> Tuple[Dict[str, object], pd.DataFrame]:
+    """
+    Fetch feeds concurrently on a bounded thread pool (optionally through a
+    conditional-GET ``cache``, see :class:`auto_research.feed_cache.FeedCache`).
+
+    Returns ``(parsed_by_url, stats)`` where ``stats`` has one row per feed:
+    feed, ok, status (HTTP; 304 = served from cache), entries, latency_s, error.
+    Wall time is roughly the slowest feed. Both are in input order.
+    """
+    urls = list(dict.fromkeys(urls))
+    done = {url: (parsed, stat) for url, parsed, stat in iter_feeds(
+        urls, max_workers=max_workers, timeout=timeout, retries=retries, backoff=backoff, cache=cache
+    )}
+    parsed_by_url = {url: done[url][0] for url in urls}
+    stats = pd.DataFrame([done[url][1] for url in urls], columns=_STATS_COLUMNS)
+    return parsed_by_url, stats
+
+
+# ---------- Streaming pipeline ----------
+class BoundedSeen:
+    """Insertion-ordered set that forgets its oldest keys beyond ``maxlen``."""
+
+    def __init__(self, maxlen: int = DEFAULT_SEEN_SIZE):
+        self.maxlen = maxlen
+        self._keys: "OrderedDict[str, None]" = OrderedDict()
+
+    def add(self, key: str) -> bool:
+        """Add ``key``; return False if it was already present."""
+        if key in self._keys:
+            return False
+        self._keys[key] = None
+        if len(self._keys) > self.maxlen:
+            self._keys.popitem(last=False)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+def _dedup_key(link: str, title: str) -> str:
+    return hashlib.blake2b(f"{link}\x00{title}".encode("utf-8"), digest_size=12).hexdigest()
+
+
+def iter_headlines(
+    feeds: Optional[Iterable[str]] = None,
+    hours_lookback: int = 48,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    timeout: float = DEFAULT_TIMEOUT,
+    use_cache: bool = True,
+    seen: Optional[BoundedSeen] = None,
+    stats: Optional[List[dict]] = None,
+) -> Iterator[dict]:
+    """
+    Yield normalized headline dicts (published, title, link, summary) feed by
+    feed as each feed finishes parsing, skipping stories outside the lookback
+    window and duplicates by cleaned link + title (``seen`` is a bounded
+    set; pass one in to dedup across calls). Per-feed stats are appended to
+    ``stats`` if given. Compose with stages such as :func:`tag_tickers`.
+    """
+    urls = list(feeds) if feeds else list(DEFAULT_FEEDS.values())
+    now = dt.datetime.utcnow()
+    cutoff = now - dt.timedelta(hours=hours_lookback)
+    seen = seen if seen is not None else BoundedSeen()
+
+    for _url, parsed, stat in iter_feeds(
+        urls, max_workers=max_workers, timeout=timeout, cache=default_feed_cache() if use_cache else None
+    ):
+        if stats is not None:
+            stats.append(stat)
+        for e in getattr(parsed, "entries", []):
+            title = (e.get("title") or "").strip()
+            link = _clean_url(e.get("link") or "")
+            published = _parse_published(e) or now
+
+            # Filter by time window
+            if published < cutoff:
+                continue
+            if not seen.add(_dedup_key(link, title)):
+                continue
+
+            yield {
+                "published": published,
+                "title": title,
+                "link": link,
+                "summary": (e.get("summary", "") or "").strip(),
+            }
+
+
+Stage = Callable[[Iterable[dict]], Iterator[dict]]
+
+
+def pipeline(source: Iterable[dict], *stages: Stage) -> Iterator[dict]:
+    """Chain stages lazily: ``pipeline(iter_headlines(), tag_tickers(m), score_sentiment())``."""
+    it: Iterable[dict] = source
+    for stage in stages:
+        it = stage(it)
+    return iter(it)
+
+
+def _batched(items: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    batch: List[dict] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def tag_tickers(ticker_map: Dict[str, Iterable[str]], only_tagged: bool = False) -> Stage:
+    """Stage: add ``tickers`` (matched over title + summary + link)."""
+    matcher = compile_ticker_map(ticker_map)
+
+    def _stage(items: Iterable[dict]) -> Iterator[dict]:
+        for item in items:
+            with span("news.pipeline.match_tickers"):  # per headline
+                item["tickers"] = matcher.match(" ".join([item["title"], item.get("summary", ""), item["link"]]))
+            if item["tickers"] or not only_tagged:
+                yield item
+
+    return _stage
+
+
+def score_sentiment(engine: Optional[SentimentEngine] = None, batch_size: int = 64,
+                    with_summary: bool = False) -> Stage:
+    """Stage: add ``sentiment_score``/``sentiment``, scoring in small batches through the cache."""
+
+    def _stage(items: Iterable[dict]) -> Iterator[dict]:
+        eng = engine or default_engine()
+        for batch in _batched(items, batch_size):
+            texts = [
+                f"{b['title']}. {b['summary']}" if with_summary and b.get("summary") else b["title"]
+                for b in batch
+            ]
+            with span("news.pipeline.sentiment"):  # per batch
+                scores = eng.score(texts)
+            for item, score in zip(batch, scores):
+                item["sentiment_score"] = score
+                item["sentiment"] = _vader_label(score)
+                yield item
+
+    return _stage
+
+
+def save_to_db(batch_size: int = 30) -> Stage:
+    """Stage: upsert items into the News table in batches, passing them through unchanged."""
+
+    def _stage(items: Iterable[dict]) -> Iterator[dict]:
+        from auto_research.db import save_news_snapshot
+
+        for batch in _batched(items, batch_size):
+            save_news_snapshot(pd.DataFrame(batch), limit=None)
+            yield from batch
+
+    return _stage
+
+
 def top_headlines(
     ticker_map: Dict[str, Iterable[str]],
     feeds: Optional[Iterable[str]] = None,
     max_items: int = 100,
     hours_lookback: int = 48,
-) -> pd.DataFrame:
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    timeout: float = DEFAULT_TIMEOUT,
+    use_cache: bool = True,
+    with_stats: bool = False,
+):
     """
     Pull top headlines from RSS/Atom feeds and tag them by ticker keywords.
+    Thin collector over :func:`iter_headlines` + :func:`tag_tickers`.
 
     Parameters
     ----------
@@ -99,6 +409,16 @@ def top_headlines(
         Limit returned rows after sorting/newest-first.
     hours_lookback : int
         Only include stories newer than now - hours_lookback.
+    max_workers : int
+        Max feeds fetched concurrently.
+    timeout : float
+        Per-request timeout (seconds) for each feed.
+    use_cache : bool
+        Revalidate feeds against the persistent ETag/Last-Modified cache
+        (``default_feed_cache()``) instead of always downloading in full.
+    with_stats : bool
+        If True, return ``(df, stats)`` where ``stats`` is the per-feed
+        latency/success frame (same columns as :func:`fetch_feeds`).
 
     Returns
     -------
@@ -107,45 +427,45 @@ def top_headlines(
         - title (str)
         - link (str, tracking params removed)
         - tickers (list[str])
+        - summary (str, feed-provided summary; may be empty)
     """
-    urls = list(feeds) if feeds else list(DEFAULT_FEEDS.values())
-    now = dt.datetime.utcnow()
-    cutoff = now - dt.timedelta(hours=hours_lookback)
-
-    rows: List[dict] = []
-    for url in urls:
-        parsed = _fetch(url)  # NEW: uses UA + retry
-        for e in getattr(parsed, "entries", []):
-            title = (e.get("title") or "").strip()
-            link = _clean_url(e.get("link") or "")
-            published = _parse_published(e) or now
-
-            # Filter by time window
-            if published < cutoff:
-                continue
-
-            # Build a matchable text blob
-            text = " ".join([title, e.get("summary", "") or "", link])
-
-            tickers = _match_tickers(text, ticker_map)
-            rows.append(
-                {
-                    "published": published,
-                    "title": title,
-                    "link": link,
-                    "tickers": tickers,
-                }
-            )
+    stats: List[dict] = []
+    rows = list(pipeline(
+        iter_headlines(feeds, hours_lookback=hours_lookback, max_workers=max_workers,
+                       timeout=timeout, use_cache=use_cache, stats=stats),
+        tag_tickers(ticker_map),
+    ))
+    stats_df = pd.DataFrame(stats, columns=_STATS_COLUMNS)
 
+    columns = ["published", "title", "link", "tickers", "summary"]
     if not rows:
-        return pd.DataFrame(columns=["published", "title", "link", "tickers"])
+        df = pd.DataFrame(columns=columns)
+        return (df, stats_df) if with_stats else df
 
-    df = pd.DataFrame(rows)
-    # Deduplicate by link/title, keep newest
-    df = df.sort_values("published", ascending=False).drop_duplicates(subset=["link", "title"], keep="first")
+    df = pd.DataFrame(rows, columns=columns)
+    # Newest first (duplicates were already dropped while streaming)
+    df = df.sort_values("published", ascending=False, kind="stable")
     if max_items:
         df = df.head(max_items)
-    return df.reset_index(drop=True)
+    df = df.reset_index(drop=True)
+    return (df, stats_df) if with_stats else df
+
+
+def filter_by_tickers(df: pd.DataFrame, tickers: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Keep headlines whose ``tickers`` list is non-empty and, if ``tickers`` is
+    given, shares at least one symbol with it. Vectorized: the lists are
+    exploded once and matched with ``isin`` instead of a per-row set lookup.
+    """
+    if df is None or df.empty or "tickers" not in df.columns:
+        return df
+    exploded = df["tickers"].reset_index(drop=True).explode()
+    hit = exploded.notna()
+    if tickers is not None:
+        hit &= exploded.isin({str(t).upper() for t in tickers})
+    keep = hit.groupby(level=0).any().to_numpy()
+    return df[keep]
+
 
 def _vader_label(compound: float) -> str:
     if compound >= 0.05:
@@ -154,9 +474,18 @@ def _vader_label(compound: float) -> str:
         return "Negative"
     return "Neutral"
 
-def add_headline_sentiment(df: pd.DataFrame, text_col: str = "title") -> pd.DataFrame:
+@timed("news.sentiment")
+def add_headline_sentiment(
+    df: pd.DataFrame,
+    text_col: str = "title",
+    summary_col: Optional[str] = None,
+    engine: Optional[SentimentEngine] = None,
+) -> pd.DataFrame:
     """
     Add VADER sentiment columns for a headline/title column.
+    If ``summary_col`` is given, the score is computed over "title. summary".
+    Scores come from a content-hash cache (``default_engine()`` unless an
+    ``engine`` is passed), so only unseen texts are scored.
     Adds:
       - sentiment_score (float, VADER compound)
       - sentiment (str: Positive/Neutral/Negative)
@@ -165,7 +494,11 @@ def add_headline_sentiment(df: pd.DataFrame, text_col: str = "title") -> pd.Data
         return df if df is not None else pd.DataFrame()
 
     out = df.copy()
-    scores = out[text_col].fillna("").map(lambda t: _analyzer.polarity_scores(str(t))["compound"])
+    texts = out[text_col].fillna("").astype(str)
+    if summary_col and summary_col in out.columns:
+        summaries = out[summary_col].fillna("").astype(str).str.strip()
+        texts = texts.where(summaries == "", texts + ". " + summaries)
+    scores = pd.Series((engine or default_engine()).score(texts.tolist()), index=out.index, dtype=float)
     out["sentiment_score"] = scores
     out["sentiment"] = scores.map(_vader_label)
     return out
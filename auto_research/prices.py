@@ -1,12 +1,90 @@
 #accepts list of ticker
 from __future__ import annotations
-from typing import Iterable, List
-import math
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import datetime as dt
+import threading
+import numpy as np
 import pandas as pd
-import yfinance as yf
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
+from auto_research.instrument import span, timed
+from auto_research.db import PriceBar, PriceCoverage, _records, get_engine, ensure_db
 
-def latest_prices(tickers: Iterable[str]) -> pd.DataFrame:
+# A fetch backend takes a chunk of symbols and returns a *wide* close matrix:
+# index = bar dates (ascending), one column per symbol. Symbols it could not
+# fetch may simply be missing; they come back as NaN rows.
+PriceBackend = Callable[[List[str]], pd.DataFrame]
+
+DEFAULT_CHUNK_SIZE = 200
+
+
+def _yf_download(symbols: List[str]) -> pd.DataFrame:
+    """Default backend: one bulk yfinance download for the whole chunk."""
+    import yfinance as yf
+
+    # Pull up to 7 calendar days to ensure we get two trading days (weekends/holidays safe)
+    data = yf.download(
+        symbols,
+        period="7d",
+        interval="1d",
+        auto_adjust=False,
+        group_by="column",
+        threads=True,
+        progress=False,
+    )
+    if data is None or data.empty:
+        return pd.DataFrame(columns=symbols, dtype=float)
+    if isinstance(data.columns, pd.MultiIndex):
+        closes = data["Close"]
+    else:
+        # Older yfinance returns flat columns for a single symbol
+        closes = data[["Close"]].rename(columns={"Close": symbols[0]})
+    return closes
+
+
+def _chunks(items: List[str], size: int) -> Iterable[List[str]]:
+    size = max(1, int(size))
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _last_and_prev(closes: pd.DataFrame, symbols: List[str]) -> Tuple[pd.Series, pd.Series]:
+    """
+    Vectorized last close and previous valid close per symbol over a wide
+    close matrix. Symbols without data (missing column or all-NaN) get NaN.
+    """
+    closes = closes.reindex(columns=symbols).sort_index().astype(float)
+    filled = closes.ffill()
+    last = filled.iloc[-1] if len(filled) else pd.Series(float("nan"), index=symbols)
+    # At each valid bar, the forward-filled value of the row before is the
+    # previous valid close; carry that forward to the last valid bar.
+    prev = filled.shift(1).where(closes.notna()).ffill()
+    prev = prev.iloc[-1] if len(prev) else pd.Series(float("nan"), index=symbols)
+    return last, prev
+
+
+def _summarize_closes(closes: pd.DataFrame, symbols: List[str]) -> pd.DataFrame:
+    """Vectorized last price / day-over-day % change over a wide close matrix."""
+    last, prev = _last_and_prev(closes, symbols)
+    pct = (last - prev) / prev.where(prev != 0) * 100.0
+
+    return pd.DataFrame(
+        {
+            "ticker": symbols,
+            "last_price": last.round(4).to_numpy(),
+            "pct_change": pct.round(4).to_numpy(),
+        },
+        columns=["ticker", "last_price", "pct_change"],
+    )
+
+
+@timed("prices.latest_prices")
+def latest_prices(
+    tickers: Iterable[str],
+    backend: Optional[PriceBackend] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> pd.DataFrame:
     """
     Fetch latest close and day-over-day percent change for each ticker.
 
@@ -14,6 +92,11 @@ def latest_prices(tickers: Iterable[str]) -> pd.DataFrame:
     ----------
     tickers : Iterable[str]
         A list (or any iterable) of ticker symbols, e.g. ["AAPL", "TSLA"].
+    backend : callable, optional
+        Fetch backend ``f(symbols) -> wide close DataFrame``. Defaults to a bulk
+        ``yf.download``; pass a local fake to benchmark offline.
+    chunk_size : int
+        Max symbols per bulk download.
 
     Returns
     -------
@@ -27,35 +110,369 @@ def latest_prices(tickers: Iterable[str]) -> pd.DataFrame:
     symbols: List[str] = sorted({t.strip().upper() for t in tickers if str(t).strip()})
     if not symbols:
         return pd.DataFrame(columns=["ticker", "last_price", "pct_change"])
+    return _summarize_closes(_download_closes(symbols, backend, chunk_size), symbols)
+
+
+def _download_closes(
+    symbols: List[str],
+    backend: Optional[PriceBackend] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> pd.DataFrame:
+    """
+    Wide recent-close matrix for ``symbols`` (one bulk download per chunk).
+    Chunks that fail are skipped, so their symbols are simply missing.
+    """
+    fetch = backend or _yf_download
+    frames: List[pd.DataFrame] = []
+    for chunk in _chunks(symbols, chunk_size):
+        try:
+            with span("prices.download"):
+                closes = fetch(chunk)
+        except Exception:
+            # If yfinance or network hiccups, the chunk's symbols stay as NaN rows so the UI doesn't crash
+            continue
+        if closes is not None and not closes.empty:
+            frames.append(closes)
+
+    closes = pd.concat(frames, axis=1) if frames else pd.DataFrame(columns=symbols, dtype=float)
+    return closes.loc[:, ~closes.columns.duplicated()]
+
+
+# ---------- Bar cache (history at any interval) ----------
+# A bar backend takes (symbols, interval, start, end) and returns a *long* frame
+# with BAR_COLUMNS; ``end`` is exclusive and times are naive UTC.
+BarBackend = Callable[[List[str], str, dt.datetime, dt.datetime], pd.DataFrame]
+
+BAR_COLUMNS = ["symbol", "ts", "open", "high", "low", "close", "adj_close", "volume"]
+
+# interval -> (bar length, how far back Yahoo serves it; None = unlimited)
+INTERVALS: Dict[str, Tuple[dt.timedelta, Optional[dt.timedelta]]] = {
+    "1m": (dt.timedelta(minutes=1), dt.timedelta(days=7)),
+    "2m": (dt.timedelta(minutes=2), dt.timedelta(days=60)),
+    "5m": (dt.timedelta(minutes=5), dt.timedelta(days=60)),
+    "15m": (dt.timedelta(minutes=15), dt.timedelta(days=60)),
+    "30m": (dt.timedelta(minutes=30), dt.timedelta(days=60)),
+    "60m": (dt.timedelta(hours=1), dt.timedelta(days=730)),
+    "1h": (dt.timedelta(hours=1), dt.timedelta(days=730)),
+    "1d": (dt.timedelta(days=1), None),
+}
+DEFAULT_HISTORY = dt.timedelta(days=365)  # default lookback when no start is given
+TRADING_MINUTES_PER_YEAR = 252 * 390
+
+_YF_FIELDS = {"Open": "open", "High": "high", "Low": "low", "Close": "close",
+              "Adj Close": "adj_close", "Volume": "volume"}
+_bars_lock = threading.Lock()  # one cache writer at a time; downloads still overlap
+
+
+def _interval(interval: str) -> Tuple[dt.timedelta, Optional[dt.timedelta]]:
+    try:
+        return INTERVALS[interval]
+    except KeyError:
+        raise ValueError(f"Unsupported interval {interval!r}. Choose from {list(INTERVALS)}") from None
+
+
+def _naive_utc(x) -> Optional[dt.datetime]:
+    if x is None:
+        return None
+    t = pd.Timestamp(x)
+    if t.tzinfo:
+        t = t.tz_convert("UTC").tz_localize(None)
+    return t.to_pydatetime()
+
+
+def _symbols(tickers: Iterable[str]) -> List[str]:
+    if isinstance(tickers, str):
+        tickers = [tickers]
+    return sorted({t.strip().upper() for t in tickers if str(t).strip()})
+
+
+def _yf_bars(symbols: List[str], interval: str, start: dt.datetime, end: dt.datetime) -> pd.DataFrame:
+    """Default bar backend: one bulk yfinance download for the chunk, reshaped long."""
+    import yfinance as yf
+
+    data = yf.download(
+        symbols,
+        start=start,
+        end=end,
+        interval=interval,
+        auto_adjust=False,
+        group_by="column",
+        threads=True,
+        progress=False,
+    )
+    if data is None or data.empty:
+        return pd.DataFrame(columns=BAR_COLUMNS)
+    if not isinstance(data.columns, pd.MultiIndex):
+        data.columns = pd.MultiIndex.from_product([data.columns, [symbols[0]]])
+    long = data.stack(level=1, future_stack=True).rename(columns=_YF_FIELDS)
+    long.index.names = ["ts", "symbol"]
+    long = long.reset_index()
+    ts = pd.to_datetime(long["ts"])
+    long["ts"] = ts.dt.tz_convert("UTC").dt.tz_localize(None) if ts.dt.tz is not None else ts
+    long = long.reindex(columns=BAR_COLUMNS)
+    long.columns.name = None
+    return long.dropna(subset=["open", "high", "low", "close"], how="all")
+
+
+def _coverage(symbols: List[str], interval: str) -> Dict[str, PriceCoverage]:
+    with get_engine().connect() as conn:
+        rows = conn.execute(
+            select(PriceCoverage).where(PriceCoverage.symbol.in_(symbols), PriceCoverage.interval == interval)
+        ).all()
+    return {r.symbol: r for r in rows}
+
 
+def _gaps(cov: Optional[PriceCoverage], start: dt.datetime, end: dt.datetime, bar: dt.timedelta,
+          now: dt.datetime, max_age: Optional[dt.timedelta]) -> List[Tuple[dt.datetime, dt.datetime]]:
+    """Ranges to download so the cached range covers [start, end] and stays contiguous."""
+    if cov is None:
+        return [(start, end)]
+    gaps = []
+    if start < cov.start:
+        gaps.append((start, cov.start))
+    # The newest cached bar may have been partial, so re-fetch from it onward
+    stale = max_age is None or now - cov.refreshed_at >= max_age
+    if end > cov.end and (stale or end - cov.end > bar):
+        gaps.append((min(cov.end - bar, end), end))
+    return gaps
+
+
+def _store_bars(interval: str, bars: pd.DataFrame) -> None:
+    if bars.empty:
+        return
+    bars = bars.reindex(columns=BAR_COLUMNS).assign(interval=interval)
+    stmt = sqlite_insert(PriceBar.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["symbol", "interval", "ts"],
+        set_={c: stmt.excluded[c] for c in BAR_COLUMNS[2:]},
+    )
+    with get_engine().begin() as conn:
+        conn.execute(stmt, _records(bars))
+
+
+def _extend_coverage(symbols: List[str], interval: str, start: dt.datetime, end: dt.datetime,
+                     now: dt.datetime) -> None:
+    cov = _coverage(symbols, interval)
     rows = []
     for sym in symbols:
-        try:
-            # Pull up to 7 calendar days to ensure we get two trading days (weekends/holidays safe)
-            hist = yf.Ticker(sym).history(period="7d", interval="1d", auto_adjust=False)
-            closes = hist.get("Close", pd.Series(dtype=float)).dropna()
+        c = cov.get(sym)
+        rows.append({
+            "symbol": sym,
+            "interval": interval,
+            "start": min(start, c.start) if c else start,
+            "end": max(end, c.end) if c else end,
+            "refreshed_at": now if c is None or end >= c.end else c.refreshed_at,
+        })
+    stmt = sqlite_insert(PriceCoverage.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["symbol", "interval"],
+        set_={c: stmt.excluded[c] for c in ("start", "end", "refreshed_at")},
+    )
+    with get_engine().begin() as conn:
+        conn.execute(stmt, rows)
 
-            if closes.empty:
-                rows.append({"ticker": sym, "last_price": math.nan, "pct_change": math.nan})
+
+def refresh_bars(
+    tickers: Iterable[str],
+    interval: str = "1d",
+    start=None,
+    end=None,
+    backend: Optional[BarBackend] = None,
+    max_age: Optional[dt.timedelta] = dt.timedelta(minutes=15),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict[str, Optional[str]]:
+    """
+    Make the local bar cache cover [start, end] for each symbol at ``interval``,
+    downloading only the missing ranges. Symbols with the same gap share one
+    bulk download. The most recent bar is re-fetched (it may still be forming)
+    unless the symbol was refreshed within ``max_age``.
+
+    Returns ``{symbol: error message or None}``; one failed chunk never aborts the others.
+    """
+    bar, limit = _interval(interval)
+    symbols = _symbols(tickers)
+    if not symbols:
+        return {}
+    ensure_db()
+    now = dt.datetime.utcnow()
+    end = min(_naive_utc(end) or now, now)
+    start = _naive_utc(start) or end - (limit or DEFAULT_HISTORY)
+    if limit is not None:
+        start = max(start, now - limit + bar)
+
+    cov = _coverage(symbols, interval)
+    plan: Dict[Tuple[dt.datetime, dt.datetime], List[str]] = {}
+    for sym in symbols:
+        for gap in _gaps(cov.get(sym), start, end, bar, now, max_age):
+            plan.setdefault(gap, []).append(sym)
+
+    fetch = backend or _yf_bars
+    errors: Dict[str, Optional[str]] = {sym: None for sym in symbols}
+    for (g_start, g_end), syms in plan.items():
+        for chunk in _chunks(syms, chunk_size):
+            try:
+                with span("prices.download_bars"):
+                    bars = fetch(chunk, interval, g_start, g_end + bar)
+            except Exception as exc:
+                errors.update({sym: f"{type(exc).__name__}: {exc}" for sym in chunk})
                 continue
+            with _bars_lock:
+                _store_bars(interval, bars)
+                _extend_coverage(chunk, interval, g_start, g_end, now)
+    return errors
 
-            last_price = float(closes.iloc[-1])
-
-            if len(closes) >= 2:
-                prev = float(closes.iloc[-2])
-                pct_change = ((last_price - prev) / prev * 100.0) if prev != 0 else math.nan
-            else:
-                pct_change = math.nan
-
-            rows.append(
-                {
-                    "ticker": sym,
-                    "last_price": round(last_price, 4),
-                    "pct_change": round(pct_change, 4) if pd.notna(pct_change) else math.nan,
-                }
-            )
-        except Exception:
-            # If yfinance or network hiccups, keep the row but with NaNs so the UI doesn't crash
-            rows.append({"ticker": sym, "last_price": math.nan, "pct_change": math.nan})
 
-    return pd.DataFrame(rows, columns=["ticker", "last_price", "pct_change"])
+def price_bars(
+    tickers: Iterable[str],
+    interval: str = "1d",
+    start=None,
+    end=None,
+    refresh: bool = True,
+    backend: Optional[BarBackend] = None,
+) -> pd.DataFrame:
+    """
+    OHLCV bars from the local cache (gaps filled first when ``refresh``),
+    ordered by (symbol, ts). Columns: BAR_COLUMNS.
+    """
+    bar, limit = _interval(interval)
+    symbols = _symbols(tickers)
+    if not symbols:
+        return pd.DataFrame(columns=BAR_COLUMNS)
+    if refresh:
+        refresh_bars(symbols, interval, start=start, end=end, backend=backend)
+    ensure_db()
+    t = PriceBar.__table__
+    q = select(*[t.c[c] for c in BAR_COLUMNS]).where(t.c.symbol.in_(symbols), t.c.interval == interval)
+    if start is not None:
+        q = q.where(t.c.ts >= _naive_utc(start))
+    if end is not None:
+        q = q.where(t.c.ts <= _naive_utc(end))
+    q = q.order_by(t.c.symbol, t.c.ts)
+    with get_engine().connect() as conn:
+        return pd.read_sql(q, conn, parse_dates=["ts"])
+
+
+def close_matrix(
+    tickers: Iterable[str],
+    interval: str = "1d",
+    start=None,
+    end=None,
+    field: str = "close",
+    refresh: bool = True,
+    backend: Optional[BarBackend] = None,
+) -> pd.DataFrame:
+    """Wide ts x symbol matrix of one bar field (default close) from the cache."""
+    symbols = _symbols(tickers)
+    bars = price_bars(symbols, interval, start=start, end=end, refresh=refresh, backend=backend)
+    wide = bars.pivot(index="ts", columns="symbol", values=field) if not bars.empty else pd.DataFrame()
+    wide = wide.reindex(columns=symbols).astype(float).sort_index()
+    wide.columns.name = None
+    return wide
+
+
+def cached_latest_prices(tickers: Iterable[str], backend: Optional[BarBackend] = None) -> pd.DataFrame:
+    """
+    Same output as :func:`latest_prices` (ticker, last_price, pct_change) but
+    served from the daily bar cache, so repeat calls only fetch the newest bar.
+    """
+    symbols = _symbols(tickers)
+    if not symbols:
+        return pd.DataFrame(columns=["ticker", "last_price", "pct_change"])
+    start = dt.datetime.utcnow() - dt.timedelta(days=10)
+    return _summarize_closes(close_matrix(symbols, "1d", start=start, backend=backend), symbols)
+
+
+DEFAULT_PERIODS: Dict[str, Optional[pd.DateOffset]] = {
+    "1D": None,  # previous bar
+    "1W": pd.DateOffset(weeks=1),
+    "1M": pd.DateOffset(months=1),
+    "3M": pd.DateOffset(months=3),
+    "6M": pd.DateOffset(months=6),
+    "YTD": None,
+    "1Y": pd.DateOffset(years=1),
+}
+
+
+def returns(
+    tickers: Iterable[str],
+    periods: Sequence[str] = tuple(DEFAULT_PERIODS),
+    asof=None,
+    refresh: bool = True,
+    backend: Optional[BarBackend] = None,
+) -> pd.DataFrame:
+    """
+    Multi-period % returns from daily closes: one row per ticker, one column
+    per period (e.g. 1D, 1W, 1M, 3M, 6M, YTD, 1Y). Each return compares the
+    last close at/before ``asof`` with the last close at/before ``asof - period``
+    (YTD: the last close of the previous year). NaN where history is too short.
+    """
+    unknown = [p for p in periods if p not in DEFAULT_PERIODS]
+    if unknown:
+        raise ValueError(f"Unknown periods: {unknown}. Choose from {list(DEFAULT_PERIODS)}")
+    symbols = _symbols(tickers)
+    asof_ts = pd.Timestamp(_naive_utc(asof) or dt.datetime.utcnow())
+    start = asof_ts - pd.DateOffset(years=1) - pd.Timedelta(days=10)
+    closes = close_matrix(symbols, "1d", start=start, end=asof_ts, refresh=refresh, backend=backend).ffill()
+
+    out = pd.DataFrame({"ticker": symbols})
+    if closes.empty:
+        for p in periods:
+            out[p] = np.nan
+        return out
+
+    values = closes.to_numpy()
+    index = closes.index.to_numpy()
+    last_pos = len(index) - 1
+    last = values[last_pos]
+    for p in periods:
+        if p == "1D":
+            pos = last_pos - 1
+        else:
+            target = pd.Timestamp(asof_ts.year, 1, 1) if p == "YTD" else asof_ts - DEFAULT_PERIODS[p]
+            # last bar strictly before the year start for YTD, at/before the target otherwise
+            side = "left" if p == "YTD" else "right"
+            pos = int(np.searchsorted(index, np.datetime64(target), side=side)) - 1
+        base = values[pos] if pos >= 0 else np.full(len(symbols), np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[p] = np.round((last / np.where(base == 0, np.nan, base) - 1.0) * 100.0, 4)
+    return out
+
+
+def rolling_stats(
+    tickers: Iterable[str],
+    window: int = 20,
+    interval: str = "1d",
+    start=None,
+    end=None,
+    refresh: bool = True,
+    backend: Optional[BarBackend] = None,
+) -> pd.DataFrame:
+    """
+    Rolling statistics per symbol over ``window`` bars, computed on the wide
+    close matrix. Columns: symbol, ts, close, ret_pct (bar-over-bar %), sma,
+    volatility (annualized std of log returns), zscore ((close - sma) / rolling
+    std of close), drawdown_pct (from the running peak).
+    """
+    bar, _ = _interval(interval)
+    closes = close_matrix(tickers, interval, start=start, end=end, refresh=refresh, backend=backend)
+    cols = ["symbol", "ts", "close", "ret_pct", "sma", "volatility", "zscore", "drawdown_pct"]
+    if closes.empty:
+        return pd.DataFrame(columns=cols)
+
+    bars_per_year = 252 if bar >= dt.timedelta(days=1) else TRADING_MINUTES_PER_YEAR / (bar.total_seconds() / 60)
+    roll = closes.rolling(window, min_periods=window)
+    sma = roll.mean()
+    std = roll.std()
+    log_ret = np.log(closes / closes.shift(1))
+    stats = {
+        "close": closes,
+        "ret_pct": closes.pct_change(fill_method=None) * 100.0,
+        "sma": sma,
+        "volatility": log_ret.rolling(window, min_periods=window).std() * np.sqrt(bars_per_year),
+        "zscore": (closes - sma) / std.where(std != 0),
+        "drawdown_pct": (closes / closes.cummax() - 1.0) * 100.0,
+    }
+    long = pd.concat({k: v.stack(future_stack=True) for k, v in stats.items()}, axis=1)
+    long.index.names = ["ts", "symbol"]
+    long = long.dropna(subset=["close"]).reset_index()
+    return long[cols].sort_values(["symbol", "ts"], kind="stable").reset_index(drop=True)
@@ -0,0 +1,245 @@
+# auto_research/queries.py
+"""
+Read-side history API over the Prices and News tables.
+
+Filters (ticker, time range) and column selection are pushed down into SQL so
+reads stay on the (ticker, snapshot_time) / snapshot_time indexes, the
+COALESCE(published, snapshot_time) expression index for headline times (a
+filter must use that exact expression to hit it) and the newsticker
+association table for headline tickers, instead of loading whole tables into
+pandas. Functions that can return many rows accept ``chunksize`` and then
+yield DataFrames instead of returning one.
+"""
+from __future__ import annotations
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
+import datetime as dt
+
+import pandas as pd
+from sqlalchemy import and_, func, select, text
+
+from auto_research.db import ROLLUP_BUCKETS, News, NewsTicker, Prices, SentimentRollup, get_engine, ensure_db
+
+TimeLike = Union[str, dt.datetime, dt.date, pd.Timestamp, None]
+
+PRICE_COLUMNS = ("snapshot_time", "ticker", "last_price", "pct_change")
+NEWS_COLUMNS = ("snapshot_time", "published", "title", "link", "tickers_json", "sentiment", "sentiment_score")
+
+
+def _ts(x: TimeLike) -> Optional[dt.datetime]:
+    """Coerce to a naive-UTC datetime (the tables store naive UTC)."""
+    if x is None:
+        return None
+    t = pd.Timestamp(x)
+    if t.tzinfo:
+        t = t.tz_convert("UTC").tz_localize(None)
+    return t.to_pydatetime()
+
+
+def _tickers(tickers: Optional[Iterable[str]]) -> Optional[List[str]]:
+    if tickers is None:
+        return None
+    if isinstance(tickers, str):
+        tickers = [tickers]
+    return [t.strip().upper() for t in tickers if str(t).strip()]
+
+
+def _pick(table, columns: Optional[Sequence[str]], allowed: Sequence[str]):
+    cols = list(columns) if columns else list(allowed)
+    unknown = [c for c in cols if c not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown columns: {unknown}. Choose from {list(allowed)}")
+    return [table.c[c] for c in cols]
+
+
+def _read(query, chunksize: Optional[int], parse_dates: Sequence[str]):
+    if chunksize:
+        return _iter_chunks(query, chunksize, parse_dates)
+    with get_engine().connect() as conn:
+        return pd.read_sql(query, conn, parse_dates=list(parse_dates))
+
+
+def _iter_chunks(query, chunksize: int, parse_dates: Sequence[str]) -> Iterator[pd.DataFrame]:
+    # The connection stays open while the caller consumes chunks
+    with get_engine().connect() as conn:
+        for chunk in pd.read_sql(query, conn, parse_dates=list(parse_dates), chunksize=chunksize):
+            yield chunk
+
+
+# ---------- Prices ----------
+def latest_snapshot(tickers: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """Most recent stored row per ticker (one indexed MAX lookup per ticker)."""
+    ensure_db()
+    p = Prices.__table__
+    syms = _tickers(tickers)
+    latest = select(p.c.ticker, func.max(p.c.snapshot_time).label("snapshot_time")).group_by(p.c.ticker)
+    if syms is not None:
+        latest = latest.where(p.c.ticker.in_(syms))
+    latest = latest.subquery()
+    q = (
+        select(p.c.ticker, p.c.snapshot_time, p.c.last_price, p.c.pct_change)
+        .join(latest, and_(p.c.ticker == latest.c.ticker, p.c.snapshot_time == latest.c.snapshot_time))
+        .order_by(p.c.ticker)
+    )
+    return _read(q, None, ["snapshot_time"]).drop_duplicates("ticker", keep="last").reset_index(drop=True)
+
+
+def price_history(
+    tickers: Optional[Iterable[str]] = None,
+    start: TimeLike = None,
+    end: TimeLike = None,
+    columns: Optional[Sequence[str]] = None,
+    chunksize: Optional[int] = None,
+):
+    """
+    Stored price snapshots ordered by (ticker, snapshot_time).
+    Only ``columns`` (default: all of PRICE_COLUMNS) are read.
+    Returns a DataFrame, or an iterator of DataFrames if ``chunksize`` is set.
+    """
+    ensure_db()
+    p = Prices.__table__
+    q = select(*_pick(p, columns, PRICE_COLUMNS))
+    syms = _tickers(tickers)
+    if syms is not None:
+        q = q.where(p.c.ticker.in_(syms))
+    if start is not None:
+        q = q.where(p.c.snapshot_time >= _ts(start))
+    if end is not None:
+        q = q.where(p.c.snapshot_time <= _ts(end))
+    q = q.order_by(p.c.ticker, p.c.snapshot_time)
+    parse = [c for c in ("snapshot_time",) if c in (columns or PRICE_COLUMNS)]
+    return _read(q, chunksize, parse)
+
+
+def price_ohlc(
+    tickers: Optional[Iterable[str]] = None,
+    freq: str = "1D",
+    start: TimeLike = None,
+    end: TimeLike = None,
+) -> pd.DataFrame:
+    """
+    OHLC bars of the stored last_price per ticker, resampled to ``freq``
+    (any pandas offset alias). Columns: ticker, snapshot_time, open, high, low, close, samples.
+    """
+    hist = price_history(tickers, start=start, end=end, columns=["ticker", "snapshot_time", "last_price"])
+    if hist.empty:
+        return pd.DataFrame(columns=["ticker", "snapshot_time", "open", "high", "low", "close", "samples"])
+    grouped = hist.set_index("snapshot_time").groupby("ticker")["last_price"].resample(freq)
+    bars = grouped.ohlc()
+    bars["samples"] = grouped.count()
+    return bars.dropna(subset=["close"]).reset_index()
+
+
+# ---------- News ----------
+def _ticker_filter(n, syms: List[str]):
+    # Indexed (ticker, news_id) lookup instead of scanning tickers_json
+    t = NewsTicker.__table__
+    return n.c.id.in_(select(t.c.news_id).where(t.c.ticker.in_(syms)))
+
+
+def news_history(
+    tickers: Optional[Iterable[str]] = None,
+    start: TimeLike = None,
+    end: TimeLike = None,
+    columns: Optional[Sequence[str]] = None,
+    chunksize: Optional[int] = None,
+    on: str = "published",
+):
+    """
+    Stored headlines, newest first, filtered by tagged ticker and published
+    time (falls back to snapshot_time when published is missing), or by
+    snapshot_time alone with ``on="snapshot_time"``.
+    Returns a DataFrame, or an iterator of DataFrames if ``chunksize`` is set.
+    """
+    if on not in ("published", "snapshot_time"):
+        raise ValueError(f"Unknown time column: {on!r}. Choose 'published' or 'snapshot_time'")
+    ensure_db()
+    n = News.__table__
+    q = select(*_pick(n, columns, NEWS_COLUMNS))
+    when = n.c.snapshot_time if on == "snapshot_time" else func.coalesce(n.c.published, n.c.snapshot_time)
+    syms = _tickers(tickers)
+    if syms:
+        q = q.where(_ticker_filter(n, syms))
+    if start is not None:
+        q = q.where(when >= _ts(start))
+    if end is not None:
+        q = q.where(when <= _ts(end))
+    q = q.order_by(when.desc())
+    parse = [c for c in ("snapshot_time", "published") if c in (columns or NEWS_COLUMNS)]
+    return _read(q, chunksize, parse)
+
+
+def daily_sentiment(
+    tickers: Optional[Iterable[str]] = None,
+    start: TimeLike = None,
+    end: TimeLike = None,
+) -> pd.DataFrame:
+    """
+    Per-ticker, per-day sentiment aggregates computed in SQL.
+    Columns: ticker, day, headlines, mean_score, positive, negative, neutral.
+    """
+    ensure_db()
+    params = {}
+    where = ["n.sentiment_score IS NOT NULL"]
+    syms = _tickers(tickers)
+    if syms:
+        names = [f"t{i}" for i in range(len(syms))]
+        where.append(f"t.ticker IN ({', '.join(':' + k for k in names)})")
+        params.update(dict(zip(names, syms)))
+    if start is not None:
+        where.append("COALESCE(n.published, n.snapshot_time) >= :start")
+        params["start"] = _ts(start).isoformat(sep=" ")
+    if end is not None:
+        where.append("COALESCE(n.published, n.snapshot_time) <= :end")
+        params["end"] = _ts(end).isoformat(sep=" ")
+    sql = text(
+        "SELECT t.ticker AS ticker,"
+        " date(COALESCE(n.published, n.snapshot_time)) AS day,"
+        " COUNT(*) AS headlines,"
+        " AVG(n.sentiment_score) AS mean_score,"
+        " SUM(n.sentiment_score >= 0.05) AS positive,"
+        " SUM(n.sentiment_score <= -0.05) AS negative,"
+        " SUM(n.sentiment_score > -0.05 AND n.sentiment_score < 0.05) AS neutral"
+        " FROM newsticker AS t JOIN news AS n ON n.id = t.news_id"
+        f" WHERE {' AND '.join(where)}"
+        " GROUP BY ticker, day ORDER BY ticker, day"
+    )
+    with get_engine().connect() as conn:
+        return pd.read_sql(sql, conn, params=params, parse_dates=["day"])
+
+
+def sentiment_trend(
+    tickers: Optional[Iterable[str]] = None,
+    start: TimeLike = None,
+    end: TimeLike = None,
+    bucket: str = "day",
+) -> pd.DataFrame:
+    """
+    Per-ticker sentiment per hour or day, read from the incrementally
+    maintained SentimentRollup table (no scan of News; history survives
+    archive compaction).
+    Columns: ticker, bucket_start, headlines, mean_score, positive_ratio,
+    negative_ratio, positive, negative, neutral.
+    """
+    if bucket not in ROLLUP_BUCKETS:
+        raise ValueError(f"Unknown bucket: {bucket!r}. Choose from {list(ROLLUP_BUCKETS)}")
+    ensure_db()
+    r = SentimentRollup.__table__
+    q = select(
+        r.c.ticker,
+        r.c.bucket_start,
+        r.c.headlines,
+        (r.c.score_sum / r.c.headlines).label("mean_score"),
+        (r.c.positive * 1.0 / r.c.headlines).label("positive_ratio"),
+        (r.c.negative * 1.0 / r.c.headlines).label("negative_ratio"),
+        r.c.positive,
+        r.c.negative,
+        r.c.neutral,
+    ).where(r.c.bucket == bucket, r.c.headlines > 0)
+    syms = _tickers(tickers)
+    if syms:
+        q = q.where(r.c.ticker.in_(syms))
+    if start is not None:
+        q = q.where(r.c.bucket_start >= _ts(start))
+    if end is not None:
+        q = q.where(r.c.bucket_start <= _ts(end))
+    return _read(q.order_by(r.c.ticker, r.c.bucket_start), None, ["bucket_start"])
@@ -0,0 +1,146 @@
+# auto_research/refresh.py
+"""
+Refresh prices, news and macro concurrently under one deadline.
+
+    from auto_research.refresh import refresh_all
+    out = refresh_all(["AAPL", "TSLA"], deadline=15)
+    out["prices"], out["news"], out["macro"]     # DataFrame, or None if that source failed/timed out
+    out["errors"], out["elapsed"]
+
+    out = await refresh_all_async(...)           # same, from inside an event loop
+
+Each source runs in its own worker thread (the fetchers are blocking), so
+wall time is roughly the slowest source rather than the sum. Fetches go
+through the shared fetch layer (auto_research/shared.py), so a refresh
+reuses recent results and joins identical in-flight requests. Sources still
+running when the deadline passes are reported in ``errors`` and left out;
+the others are returned as soon as they finish.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, Iterable, List, Optional
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+from auto_research.instrument import span
+
+SOURCES = ("prices", "news", "macro")
+DEFAULT_DEADLINE = 20.0  # seconds for the whole refresh
+DEFAULT_MACRO_SERIES = ("TOTALSA", "INDPRO")
+
+
+def _jobs(
+    symbols: List[str],
+    ticker_map: Optional[Dict[str, Iterable[str]]],
+    macro_series: Iterable[str],
+    macro_start: str,
+    news_lookback: int,
+    news_max_items: int,
+    deadline: float,
+    with_sentiment: bool,
+) -> Dict[str, Callable[[], object]]:
+    def prices():
+        from auto_research.shared import shared_prices
+
+        return shared_prices(symbols)
+
+    def news():
+        from auto_research.news import DEFAULT_TIMEOUT, add_headline_sentiment
+        from auto_research.shared import shared_headlines
+
+        # Per-feed HTTP timeout never outlives the shared deadline
+        df = shared_headlines(ticker_map or {t: [t] for t in symbols}, hours_lookback=news_lookback,
+                              max_items=news_max_items, timeout=min(DEFAULT_TIMEOUT, deadline))
+        return add_headline_sentiment(df, text_col="title") if with_sentiment else df
+
+    def macro():
+        from auto_research.shared import shared_macro
+
+        return shared_macro(macro_series, start=macro_start)
+
+    return {"prices": prices, "news": news, "macro": macro}
+
+
+def _timed(name: str, fn: Callable[[], object]):
+    def run():
+        t0 = time.perf_counter()
+        with span(f"refresh.{name}"):
+            out = fn()
+        return out, time.perf_counter() - t0
+    return run
+
+
+async def refresh_all_async(
+    symbols: Iterable[str],
+    ticker_map: Optional[Dict[str, Iterable[str]]] = None,
+    macro_series: Iterable[str] = DEFAULT_MACRO_SERIES,
+    macro_start: str = "2000-01-01",
+    news_lookback: int = 48,
+    news_max_items: int = 50,
+    deadline: float = DEFAULT_DEADLINE,
+    sources: Iterable[str] = SOURCES,
+    with_sentiment: bool = True,
+) -> dict:
+    """
+    Run the selected ``sources`` concurrently and wait at most ``deadline`` seconds.
+
+    Returns a dict with one key per source (DataFrame, or None if it failed or
+    missed the deadline), ``errors`` ({source: message}) and ``elapsed``
+    ({source: seconds} for finished sources, plus ``"total"``). News uses
+    ``ticker_map`` (default: each symbol matches itself) and gets sentiment
+    columns unless ``with_sentiment=False``.
+    """
+    syms = [s.strip().upper() for s in symbols if str(s).strip()]
+    wanted = list(dict.fromkeys(sources))
+    unknown = [s for s in wanted if s not in SOURCES]
+    if unknown:
+        raise ValueError(f"Unknown sources: {unknown}. Choose from {list(SOURCES)}")
+    jobs = _jobs(syms, ticker_map, macro_series, macro_start, news_lookback, news_max_items,
+                 deadline, with_sentiment)
+
+    out: dict = {name: None for name in wanted}
+    out["errors"], out["elapsed"] = {}, {}
+    if not wanted:
+        out["elapsed"]["total"] = 0.0
+        return out
+
+    loop = asyncio.get_running_loop()
+    t0 = time.perf_counter()
+    # Own pool so a source that overruns the deadline is abandoned, not waited on
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=len(wanted), thread_name_prefix="refresh")
+    try:
+        tasks = {loop.run_in_executor(pool, _timed(name, jobs[name])): name for name in wanted}
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in done:
+            name = tasks[task]
+            try:
+                out[name], out["elapsed"][name] = task.result()
+            except Exception as exc:
+                out["errors"][name] = f"{type(exc).__name__}: {exc}"
+        for task in pending:
+            task.cancel()
+            out["errors"][tasks[task]] = f"timed out after {deadline:g}s"
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    out["elapsed"]["total"] = time.perf_counter() - t0
+    return out
+
+
+def refresh_all(symbols: Iterable[str], **kwargs) -> dict:
+    """Blocking wrapper around :func:`refresh_all_async` (same arguments and result)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(refresh_all_async(symbols, **kwargs))
+
+    # Called from inside a running loop (e.g. a notebook): run on a helper thread
+    result: dict = {}
+
+    def _run():
+        result["out"] = asyncio.run(refresh_all_async(symbols, **kwargs))
+
+    t = threading.Thread(target=_run, name="refresh-all")
+    t.start()
+    t.join()
+    return result["out"]
@@ -0,0 +1,165 @@
+# auto_research/sentiment.py
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Sequence
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from auto_research.instrument import count, span
+
+_analyzer = None  # VADER loads its lexicon on construction; built on first score
+
+# Score cache lives next to the main DB at repo root, e.g., ./sentiment_cache.db
+ROOT = Path(__file__).resolve().parents[1]
+SENTIMENT_CACHE_PATH = ROOT / "sentiment_cache.db"
+
+DEFAULT_LRU_SIZE = 50_000
+DEFAULT_POOL_THRESHOLD = 2_000  # unseen texts before scoring moves to a process pool
+
+
+def text_key(text: str) -> str:
+    """Content hash used as the cache key for a scored text."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _get_analyzer():
+    global _analyzer
+    if _analyzer is None:
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+        _analyzer = SentimentIntensityAnalyzer()
+    return _analyzer
+
+
+def _score_chunk(texts: List[str]) -> List[float]:
+    # Runs in worker processes too; each process builds its own analyzer
+    analyzer = _get_analyzer()
+    return [analyzer.polarity_scores(t)["compound"] for t in texts]
+
+
+class SentimentEngine:
+    """
+    VADER compound scoring with an in-memory LRU keyed by content hash and an
+    optional persistent SQLite score store, so only unseen texts get scored.
+    Large batches of unseen texts are scored on a process pool.
+    """
+
+    def __init__(
+        self,
+        store_path: Optional[Path] = None,
+        lru_size: int = DEFAULT_LRU_SIZE,
+        pool_threshold: int = DEFAULT_POOL_THRESHOLD,
+        workers: Optional[int] = None,
+    ):
+        self.lru_size = lru_size
+        self.pool_threshold = pool_threshold
+        self.workers = workers or max(1, (os.cpu_count() or 1) - 1)
+        self._lru: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        if store_path:
+            path = Path(store_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sentiment_scores (key TEXT PRIMARY KEY, compound REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    # ---------- Cache layers ----------
+    def _lru_get_many(self, keys: Iterable[str]) -> Dict[str, float]:
+        found: Dict[str, float] = {}
+        with self._lock:
+            for k in keys:
+                v = self._lru.get(k)
+                if v is not None:
+                    self._lru.move_to_end(k)
+                    found[k] = v
+        return found
+
+    def _lru_put_many(self, scores: Dict[str, float]) -> None:
+        with self._lock:
+            for k, v in scores.items():
+                self._lru[k] = v
+                self._lru.move_to_end(k)
+            while len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+
+    def _store_get_many(self, keys: List[str]) -> Dict[str, float]:
+        if self._conn is None or not keys:
+            return {}
+        found: Dict[str, float] = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):  # stay under SQLite's bound-parameter limit
+                chunk = keys[i:i + 500]
+                q = f"SELECT key, compound FROM sentiment_scores WHERE key IN ({','.join('?' * len(chunk))})"
+                found.update(self._conn.execute(q, chunk).fetchall())
+        return found
+
+    def _store_put_many(self, scores: Dict[str, float]) -> None:
+        if self._conn is None or not scores:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sentiment_scores (key, compound) VALUES (?, ?)", scores.items()
+            )
+            self._conn.commit()
+
+    # ---------- Scoring ----------
+    def _score_unseen(self, texts: List[str]) -> List[float]:
+        if len(texts) < self.pool_threshold or self.workers <= 1:
+            return _score_chunk(texts)
+        size = -(-len(texts) // (self.workers * 4))
+        chunks = [texts[i:i + size] for i in range(0, len(texts), size)]
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            return [s for part in pool.map(_score_chunk, chunks) for s in part]
+
+    def score(self, texts: Sequence[str]) -> List[float]:
+        """Return VADER compound scores aligned with ``texts``."""
+        texts = ["" if t is None else str(t) for t in texts]
+        keys = [text_key(t) for t in texts]
+        unique = dict(zip(keys, texts))
+
+        found = self._lru_get_many(unique)
+        missing = [k for k in unique if k not in found]
+        from_store = self._store_get_many(missing)
+        found.update(from_store)
+
+        todo = [k for k in missing if k not in from_store]
+        with span("sentiment.vader"):
+            fresh = dict(zip(todo, self._score_unseen([unique[k] for k in todo]))) if todo else {}
+        found.update(fresh)
+
+        self.hits += len(unique) - len(todo)
+        self.misses += len(todo)
+        count("sentiment.hit", len(unique) - len(todo))
+        count("sentiment.miss", len(todo))
+        self._lru_put_many({k: found[k] for k in missing})
+        self._store_put_many(fresh)
+        return [found[k] for k in keys]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM sentiment_scores")
+                self._conn.commit()
+
+
+_default_engine: Optional[SentimentEngine] = None
+_default_lock = threading.Lock()
+
+
+def default_engine() -> SentimentEngine:
+    """Process-wide engine backed by SENTIMENT_CACHE_PATH, created on first use."""
+    global _default_engine
+    with _default_lock:
+        if _default_engine is None:
+            _default_engine = SentimentEngine(store_path=SENTIMENT_CACHE_PATH)
+        return _default_engine
@@ -0,0 +1,277 @@
+# auto_research/shared.py
+"""
+Process-wide shared fetch layer: one upstream call per distinct request.
+
+    from auto_research.shared import shared_headlines, shared_macro, shared_prices, shared_fetcher
+    df = shared_prices(["AAPL", "TSLA"])          # same frame for every session within PRICES TTL
+    shared_fetcher().stats()                      # per-source hits / coalesced / fetches / bytes
+
+All dashboard sessions run in one process, so they share one ``SharedFetcher``.
+A request whose result is cached and younger than its source's TTL is a hit.
+If an identical request is already in flight, callers wait for it instead of
+sending their own (single-flight) and all get its result, waiting at most
+``wait_timeout`` seconds; errors propagate to every waiter and are not cached.
+Entries are evicted least recently used once the store exceeds ``max_entries``
+or ``max_bytes``.
+"""
+from __future__ import annotations
+from typing import TYPE_CHECKING, Callable, Dict, Hashable, Iterable, Optional, Tuple
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future
+
+from auto_research.instrument import count
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_TTLS: Dict[str, float] = {"prices": 60.0, "news": 300.0, "macro": 3600.0}  # seconds
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_WAIT_TIMEOUT = 120.0  # seconds a caller waits on another caller's fetch
+PARTIAL_TTL = 30.0            # seconds to keep headlines when some feeds failed
+
+_STAT_FIELDS = ("requests", "hits", "coalesced", "fetches", "errors", "evictions")
+
+
+def _sizeof(value) -> int:
+    """Approximate in-memory size (DataFrames counted deep, tuples summed)."""
+    if hasattr(value, "memory_usage"):
+        usage = value.memory_usage(index=True, deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if isinstance(value, tuple):
+        return sum(_sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def _copy(value):
+    # Callers may add columns to what they get back; never hand out the cached object
+    if isinstance(value, tuple):
+        return tuple(_copy(v) for v in value)
+    return value.copy() if hasattr(value, "copy") else value
+
+
+def _freeze(obj) -> Hashable:
+    """Hashable, order-insensitive form of a request argument (dicts, lists, sets)."""
+    if isinstance(obj, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in obj.items()))
+    if isinstance(obj, (set, frozenset)):
+        return tuple(sorted(_freeze(v) for v in obj))
+    if isinstance(obj, (list, tuple)):
+        return tuple(_freeze(v) for v in obj)
+    return obj
+
+
+class SharedFetcher:
+    """
+    Thread-safe TTL + LRU result store with single-flight fetches, keyed on
+    ``(source, key)``. ``ttls`` maps source name to seconds (sources without
+    an entry use ``default_ttl``). Callers that find a fetch in flight wait up
+    to ``wait_timeout`` seconds for it, then get ``TimeoutError``.
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = 60.0,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        wait_timeout: Optional[float] = DEFAULT_WAIT_TIMEOUT,
+    ):
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        # (source, key) -> (value, expires_at, nbytes), least recently used first
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[object, float, int]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, Hashable], Future] = {}
+        self._bytes = 0
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(_STAT_FIELDS, 0))
+
+    # ---------- Fetch ----------
+    def get(
+        self,
+        source: str,
+        key: Hashable,
+        fetch: Callable[[], object],
+        ttl: Optional[float] = None,
+        ttl_of: Optional[Callable[[object], float]] = None,
+    ):
+        """
+        Return the cached result for ``(source, key)`` or call ``fetch()`` once
+        for all concurrent callers. Returns a copy, so callers may mutate it.
+        ``ttl_of(value)``, if given, picks the lifetime from the fetched result
+        (e.g. shorter for partial results) and overrides ``ttl``.
+        """
+        ident = (source, key)
+        now = time.monotonic()
+        with self._lock:
+            stats = self._stats[source]
+            stats["requests"] += 1
+            entry = self._entries.get(ident)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(ident)
+                stats["hits"] += 1
+                count(f"shared.{source}.hit")
+                return _copy(entry[0])
+            if entry is not None:
+                self._drop(ident)
+            pending = self._inflight.get(ident)
+            leader = pending is None
+            if leader:
+                pending = self._inflight[ident] = Future()
+                stats["fetches"] += 1
+                count(f"shared.{source}.miss")
+            else:
+                stats["coalesced"] += 1
+                count(f"shared.{source}.hit")
+
+        if not leader:
+            return _copy(pending.result(timeout=self.wait_timeout))
+
+        try:
+            value = fetch()
+        except BaseException as exc:
+            with self._lock:
+                self._stats[source]["errors"] += 1
+                del self._inflight[ident]
+            pending.set_exception(exc)
+            raise
+        nbytes = _sizeof(value)
+        with self._lock:
+            del self._inflight[ident]
+            if nbytes <= self.max_bytes:
+                lifetime = self.ttls.get(source, self.default_ttl) if ttl is None else ttl
+                if ttl_of is not None:
+                    lifetime = ttl_of(value)
+                self._entries[ident] = (value, time.monotonic() + lifetime, nbytes)
+                self._bytes += nbytes
+                self._evict()
+        pending.set_result(value)
+        return _copy(value)
+
+    def _drop(self, ident) -> None:
+        _, _, nbytes = self._entries.pop(ident)
+        self._bytes -= nbytes
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            ident = next(iter(self._entries))
+            self._drop(ident)
+            self._stats[ident[0]]["evictions"] += 1
+
+    # ---------- Maintenance ----------
+    def invalidate(self, source: Optional[str] = None) -> int:
+        """Drop cached results (of one source, or all). In-flight fetches are unaffected."""
+        with self._lock:
+            idents = [i for i in self._entries if source is None or i[0] == source]
+            for ident in idents:
+                self._drop(ident)
+        return len(idents)
+
+    def clear(self) -> None:
+        """Drop every cached result and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._stats.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    # ---------- Stats ----------
+    def stats(self) -> pd.DataFrame:
+        """
+        One row per source: requests, hits, coalesced (waited on another
+        caller's in-flight fetch), fetches (upstream calls), errors, evictions,
+        cached entries and bytes, plus hit_ratio ((hits + coalesced) / requests)
+        and coalesce_ratio (coalesced / requests).
+        """
+        import pandas as pd
+
+        with self._lock:
+            stats = {s: dict(v) for s, v in self._stats.items()}
+            held: Dict[str, list] = defaultdict(lambda: [0, 0])
+            for (source, _), (_, _, nbytes) in self._entries.items():
+                held[source][0] += 1
+                held[source][1] += nbytes
+        rows = []
+        for source in sorted(set(stats) | set(held)):
+            s = stats.get(source, dict.fromkeys(_STAT_FIELDS, 0))
+            req = s["requests"]
+            rows.append({
+                "source": source, **s,
+                "entries": held[source][0], "bytes": held[source][1],
+                "hit_ratio": round((s["hits"] + s["coalesced"]) / req, 4) if req else float("nan"),
+                "coalesce_ratio": round(s["coalesced"] / req, 4) if req else float("nan"),
+            })
+        cols = ["source", *_STAT_FIELDS, "entries", "bytes", "hit_ratio", "coalesce_ratio"]
+        return pd.DataFrame(rows, columns=cols)
+
+
+_default_fetcher: Optional[SharedFetcher] = None
+_default_lock = threading.Lock()
+
+
+def shared_fetcher() -> SharedFetcher:
+    """Process-wide fetcher shared by every dashboard session, created on first use."""
+    global _default_fetcher
+    with _default_lock:
+        if _default_fetcher is None:
+            _default_fetcher = SharedFetcher()
+        return _default_fetcher
+
+
+# ---------- Shared data sources ----------
+def shared_prices(symbols: Iterable[str], **kwargs):
+    """``latest_prices`` shared across callers; the same symbols in any order share one fetch."""
+    from auto_research.prices import latest_prices
+
+    order = list(dict.fromkeys(s.strip().upper() for s in symbols if str(s).strip()))
+    wanted = sorted(order)
+    df = shared_fetcher().get("prices", (tuple(wanted), _freeze(kwargs)),
+                              lambda: latest_prices(wanted, **kwargs))
+    if "ticker" in df.columns and order != wanted:
+        pos = {t: i for i, t in enumerate(order)}
+        df = df.iloc[df["ticker"].map(pos).argsort(kind="stable")].reset_index(drop=True)
+    return df
+
+
+def shared_headlines(ticker_map: Dict[str, Iterable[str]], hours_lookback: int = 48,
+                     max_items: Optional[int] = 50, with_stats: bool = False, **kwargs):
+    """
+    ``top_headlines`` shared across callers with the same map, lookback and
+    options (timeout included: a shorter one can drop slow feeds). A result
+    where any feed failed is kept only ``PARTIAL_TTL`` seconds.
+    """
+    from auto_research.news import top_headlines
+
+    fetcher = shared_fetcher()
+    full_ttl = fetcher.ttls.get("news", fetcher.default_ttl)
+
+    def ttl_of(value) -> float:
+        _, stats = value
+        return full_ttl if stats["ok"].all() else min(PARTIAL_TTL, full_ttl)
+
+    key = (_freeze(ticker_map), hours_lookback, max_items, _freeze(kwargs))
+    df, stats = fetcher.get(
+        "news", key,
+        lambda: top_headlines(ticker_map, hours_lookback=hours_lookback, max_items=max_items,
+                              with_stats=True, **kwargs),
+        ttl_of=ttl_of,
+    )
+    return (df, stats) if with_stats else df
+
+
+def shared_macro(series_ids: Iterable[str], start: str = "2000-01-01", **kwargs):
+    """``macro_dataframe`` shared across callers asking for the same series and start."""
+    from auto_research.macro import macro_dataframe
+
+    ids = list(series_ids)
+    return shared_fetcher().get("macro", (tuple(ids), start, _freeze(kwargs)),
+                                lambda: macro_dataframe(ids, start=start, **kwargs))
@@ -0,0 +1,231 @@
+# auto_research/snapshot.py
+"""
+Long-lived, array-backed latest-price state for large watchlists.
+
+    from auto_research.snapshot import watchlist_store
+    store = watchlist_store()
+    store.refresh(universe)                  # download + update in place
+    store.update_frame(latest_prices(...))   # or feed an existing fetch result
+    store.get("AAPL")                        # O(1) dict lookup -> row
+    store.top_movers(10, absolute=True)
+    store.threshold(above=5.0)               # pct_change > 5 %
+    store.frame()                            # zero-copy, read-only DataFrame view
+
+Each symbol owns one row of a single float64 block (last_price, prev_close,
+pct_change, as_of epoch seconds), found through a symbol -> row dict. Updates
+write into the block in place; a symbol whose fetch failed keeps its last
+known values. 5,000 symbols take ~160 KB of floats.
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from auto_research.prices import DEFAULT_CHUNK_SIZE, PriceBackend, _download_closes, _last_and_prev
+
+FIELDS = ("last_price", "prev_close", "pct_change", "as_of")  # as_of: epoch seconds of the update
+DEFAULT_CAPACITY = 1024
+
+_LAST, _PREV, _PCT, _AS_OF = range(len(FIELDS))
+
+
+class PriceSnapshotStore:
+    """
+    Latest price, previous close, % change and update time per symbol, held
+    in one preallocated (capacity x 4) float64 array that doubles when full.
+    Thread-safe; readers get copies except from ``frame()`` without symbols.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self._values = np.full((max(1, int(capacity)), len(FIELDS)), np.nan)
+        self._symbols = np.empty(len(self._values), dtype=object)
+        self._index: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    # ---------- Writes ----------
+    def _rows(self, symbols: List[str]) -> np.ndarray:
+        """Row of each symbol, appending unseen ones (caller holds the lock)."""
+        new = [s for s in dict.fromkeys(symbols) if s not in self._index]
+        if new:
+            n = len(self._index)
+            need = n + len(new)
+            if need > len(self._values):
+                cap = max(need, 2 * len(self._values))
+                values = np.full((cap, len(FIELDS)), np.nan)
+                values[:n] = self._values[:n]
+                names = np.empty(cap, dtype=object)
+                names[:n] = self._symbols[:n]
+                self._values, self._symbols = values, names
+            self._symbols[n:need] = new
+            self._index.update(zip(new, range(n, need)))
+        return np.fromiter((self._index[s] for s in symbols), dtype=np.intp, count=len(symbols))
+
+    def update(
+        self,
+        symbols: Iterable[str],
+        last,
+        prev=None,
+        as_of: Optional[float] = None,
+    ) -> int:
+        """
+        Write last (and previous) closes for ``symbols`` in place; ``last`` and
+        ``prev`` are array-likes aligned with ``symbols`` and % change is
+        recomputed from them. Symbols with a NaN last price are left untouched
+        (they keep their last known state). Returns the number of rows written.
+        """
+        syms = [str(s).strip().upper() for s in symbols]
+        last_arr = np.asarray(last, dtype=float)
+        prev_arr = np.full(len(syms), np.nan) if prev is None else np.asarray(prev, dtype=float)
+        if not (len(syms) == len(last_arr) == len(prev_arr)):
+            raise ValueError("symbols, last and prev must have the same length")
+        ok = ~np.isnan(last_arr)
+        if not ok.any():
+            return 0
+        syms = [s for s, keep in zip(syms, ok) if keep]
+        last_arr, prev_arr = last_arr[ok], prev_arr[ok]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct = np.where(prev_arr != 0, (last_arr - prev_arr) / prev_arr * 100.0, np.nan)
+        with self._lock:
+            rows = self._rows(syms)
+            self._values[rows, _LAST] = last_arr
+            self._values[rows, _PREV] = prev_arr
+            self._values[rows, _PCT] = pct
+            self._values[rows, _AS_OF] = time.time() if as_of is None else as_of
+        return len(rows)
+
+    def update_frame(self, df: pd.DataFrame, as_of: Optional[float] = None) -> int:
+        """
+        Update from a ``latest_prices``-shaped frame (ticker, last_price,
+        pct_change). The previous close is taken from a ``prev_close`` column
+        if present, else derived from last_price and pct_change.
+        """
+        if df is None or df.empty:
+            return 0
+        last = pd.to_numeric(df["last_price"], errors="coerce").to_numpy(dtype=float)
+        if "prev_close" in df.columns:
+            prev = pd.to_numeric(df["prev_close"], errors="coerce").to_numpy(dtype=float)
+        elif "pct_change" in df.columns:
+            pct = pd.to_numeric(df["pct_change"], errors="coerce").to_numpy(dtype=float)
+            prev = last / (1.0 + pct / 100.0)
+        else:
+            prev = None
+        return self.update(df["ticker"].astype(str), last, prev, as_of=as_of)
+
+    def refresh(
+        self,
+        tickers: Iterable[str],
+        backend: Optional[PriceBackend] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> int:
+        """Download recent closes for ``tickers`` and update in place. Returns rows written."""
+        symbols = sorted({t.strip().upper() for t in tickers if str(t).strip()})
+        if not symbols:
+            return 0
+        last, prev = _last_and_prev(_download_closes(symbols, backend, chunk_size), symbols)
+        return self.update(symbols, last.to_numpy(), prev.to_numpy())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values[:] = np.nan
+            self._index.clear()
+
+    # ---------- Reads ----------
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, symbol: str) -> bool:
+        return str(symbol).strip().upper() in self._index
+
+    @property
+    def symbols(self) -> List[str]:
+        with self._lock:
+            return self._symbols[:len(self._index)].tolist()
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the value block and symbol array (capacity, not just used rows)."""
+        return int(self._values.nbytes + self._symbols.nbytes)
+
+    def get(self, symbol: str) -> Optional[dict]:
+        """``{"ticker", "last_price", "prev_close", "pct_change", "as_of"}`` or None if unknown."""
+        sym = str(symbol).strip().upper()
+        with self._lock:
+            row = self._index.get(sym)
+            if row is None:
+                return None
+            values = self._values[row].tolist()
+        return {"ticker": sym, **dict(zip(FIELDS, values))}
+
+    def frame(self, symbols: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Rows indexed by ticker with FIELDS as columns. Without ``symbols`` this
+        is a read-only view of the live block (no copy; it reflects later
+        in-place updates until the store grows). With ``symbols`` it is a copy
+        in that order, unknown symbols as NaN rows.
+        """
+        with self._lock:
+            n = len(self._index)
+            if symbols is None:
+                block = self._values[:n].view()
+                block.flags.writeable = False
+                index = pd.Index(self._symbols[:n], name="ticker", copy=False)
+                return pd.DataFrame(block, index=index, columns=list(FIELDS), copy=False)
+            syms = [str(s).strip().upper() for s in symbols]
+            rows = np.fromiter((self._index.get(s, -1) for s in syms), dtype=np.intp, count=len(syms))
+            out = self._values[np.where(rows >= 0, rows, 0)]
+        out[rows < 0] = np.nan
+        return pd.DataFrame(out, index=pd.Index(syms, name="ticker"), columns=list(FIELDS))
+
+    def top_movers(self, n: int = 10, ascending: bool = False, absolute: bool = False) -> pd.DataFrame:
+        """
+        The ``n`` symbols with the largest % change (smallest if ``ascending``;
+        largest magnitude if ``absolute``), best first. Symbols without a
+        % change are skipped.
+        """
+        with self._lock:
+            size = len(self._index)
+            pct = self._values[:size, _PCT]
+            # Sort key: smallest first
+            key = -np.abs(pct) if absolute else (pct if ascending else -pct)
+            valid = np.flatnonzero(~np.isnan(key))
+            k = min(max(0, int(n)), len(valid))
+            if k == 0:
+                return self._take(np.empty(0, dtype=np.intp))
+            part = valid[np.argpartition(key[valid], k - 1)[:k]] if k < len(valid) else valid
+            rows = part[np.argsort(key[part], kind="stable")]
+            return self._take(rows)
+
+    def threshold(self, field: str = "pct_change", above: Optional[float] = None,
+                  below: Optional[float] = None) -> pd.DataFrame:
+        """Rows whose ``field`` is > ``above`` and/or < ``below`` (NaN never matches)."""
+        if field not in FIELDS:
+            raise ValueError(f"Unknown field: {field!r}. Choose from {list(FIELDS)}")
+        with self._lock:
+            col = self._values[:len(self._index), FIELDS.index(field)]
+            mask = ~np.isnan(col)
+            if above is not None:
+                mask &= col > above
+            if below is not None:
+                mask &= col < below
+            return self._take(np.flatnonzero(mask))
+
+    def _take(self, rows: np.ndarray) -> pd.DataFrame:
+        # Caller holds the lock; fancy indexing copies
+        return pd.DataFrame(self._values[rows], index=pd.Index(self._symbols[rows], name="ticker"),
+                            columns=list(FIELDS))
+
+
+_default_store: Optional[PriceSnapshotStore] = None
+_default_lock = threading.Lock()
+
+
+def watchlist_store() -> PriceSnapshotStore:
+    """Process-wide store shared by every dashboard session, created on first use."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = PriceSnapshotStore()
+        return _default_store
@@ -0,0 +1,106 @@
+"""
+SQLite engine-profile benchmark: insert and read throughput on the
+Prices/News tables with one writer and one reader running concurrently.
+
+    python -m benchmarks.bench_db --seconds 5
+"""
+from __future__ import annotations
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+import auto_research.db as db
+
+
+def _prices_frame(n: int, rng: np.random.Generator) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "ticker": [f"S{i:04d}" for i in rng.integers(0, 500, n)],
+            "last_price": rng.uniform(10, 500, n),
+            "pct_change": rng.normal(0, 2, n),
+        }
+    )
+
+
+def _news_frame(n: int, seq: int) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "published": pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(n), unit="min"),
+            "title": [f"headline {seq}-{i}" for i in range(n)],
+            "link": [f"https://example.com/{seq}/{i}" for i in range(n)],
+            "tickers": [["S0001"]] * n,
+            "sentiment": "Neutral",
+            "sentiment_score": 0.0,
+        }
+    )
+
+
+def run_profile(profile: str, seconds: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        eng = db.make_engine(Path(tmp) / "bench.db", profile)
+        db.set_engine(eng)
+        db.init_db()
+        stop = threading.Event()
+        counts = {"prices_rows": 0, "news_rows": 0, "reads": 0, "write_errors": 0, "read_errors": 0}
+
+        def writer():
+            rng = np.random.default_rng(0)
+            seq = 0
+            while not stop.is_set():
+                try:
+                    counts["prices_rows"] += db.save_prices_snapshot(_prices_frame(30, rng))
+                    counts["news_rows"] += db.save_news_snapshot(_news_frame(30, seq))
+                except Exception:
+                    counts["write_errors"] += 1
+                seq += 1
+
+        def reader():
+            while not stop.is_set():
+                try:
+                    with eng.connect() as conn:
+                        conn.execute(text(
+                            "SELECT ticker, last_price FROM prices WHERE ticker = 'S0001' "
+                            "ORDER BY snapshot_time DESC LIMIT 50"
+                        )).fetchall()
+                        conn.execute(text("SELECT COUNT(*) FROM news")).fetchone()
+                    counts["reads"] += 1
+                except Exception:
+                    counts["read_errors"] += 1
+
+        threads = [threading.Thread(target=writer), threading.Thread(target=reader)]
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        eng.dispose()
+    return {k: v / seconds if k in ("prices_rows", "news_rows", "reads") else v for k, v in counts.items()}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--profiles", nargs="+", default=list(db.SQLITE_PROFILES))
+    args = ap.parse_args()
+
+    original = db.set_engine(None)
+    try:
+        for profile in args.profiles:
+            r = run_profile(profile, args.seconds)
+            print(
+                f"{profile:>8}: prices {r['prices_rows']:9.0f} rows/s  news {r['news_rows']:8.0f} rows/s  "
+                f"reads {r['reads']:8.0f} q/s  errors w={r['write_errors']} r={r['read_errors']}"
+            )
+    finally:
+        db.set_engine(original)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Import-time gate for the auto_research modules (cold start of the collector/dashboard).
+
+    python -m benchmarks.bench_importtime              # check budgets, exit 1 on failure
+    python -m benchmarks.bench_importtime --scale 2    # slower machine: double every budget
+
+Each module is imported in a fresh ``python -X importtime`` process (best of
+``--repeat``). A module fails the gate if its cumulative import time exceeds
+its budget, if importing it pulls in a dependency that should only load on
+first use (streamlit, feedparser, vaderSentiment, yfinance, requests), or if
+it creates the SQLite engine.
+"""
+from __future__ import annotations
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Set, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Cumulative import budgets in ms. pandas alone is ~600 ms cold, sqlmodel ~400 ms.
+BUDGETS_MS: Dict[str, float] = {
+    "auto_research.config": 50,
+    "auto_research.instrument": 60,
+    "auto_research.sentiment": 150,
+    "auto_research.matcher": 60,
+    "auto_research.feed_cache": 60,
+    "auto_research.dedup": 60,
+    "auto_research.shared": 60,
+    "auto_research.db": 900,
+    "auto_research.collector": 1000,
+    "auto_research.news": 1200,
+    "auto_research.prices": 1600,
+    "auto_research.snapshot": 1600,
+    "auto_research.macro": 1600,
+    "auto_research.queries": 1600,
+}
+LAZY = ("streamlit", "feedparser", "vaderSentiment", "yfinance", "requests")
+
+_PROBE = (
+    "import sys, {mod}\n"
+    "db = sys.modules.get('auto_research.db')\n"
+    "print('ENGINE', bool(db is not None and db._engine is not None))\n"
+)
+
+
+def measure(mod: str) -> Tuple[float, Set[str], bool]:
+    """Return (cumulative ms, imported top-level packages, engine created) for one cold import."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(mod=mod)],
+        capture_output=True, text=True, cwd=ROOT, check=True,
+    )
+    total_us, loaded = 0, set()
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        loaded.add(name.split(".")[0])
+        if name == mod:
+            total_us = int(cumulative)
+    return total_us / 1000.0, loaded, "ENGINE True" in out.stdout
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.bench_importtime")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--scale", type=float, default=1.0, help="multiply every budget (slow CI boxes)")
+    ap.add_argument("modules", nargs="*", default=list(BUDGETS_MS))
+    args = ap.parse_args()
+
+    failed = False
+    print(f"{'module':<28}{'import':>10}{'budget':>10}  status")
+    for mod in args.modules:
+        runs = [measure(mod) for _ in range(max(1, args.repeat))]
+        ms = min(r[0] for r in runs)
+        loaded, engine = runs[0][1], runs[0][2]
+        budget = BUDGETS_MS.get(mod, float("inf")) * args.scale
+        problems = []
+        if ms > budget:
+            problems.append("over budget")
+        eager = sorted(m for m in LAZY if m in loaded)
+        if eager:
+            problems.append("imports " + ", ".join(eager))
+        if engine:
+            problems.append("creates DB engine")
+        failed |= bool(problems)
+        print(f"{mod:<28}{ms:>8.0f}ms{budget:>8.0f}ms  {'; '.join(problems) or 'ok'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Compare the compiled KeywordMatcher against the legacy per-keyword re.search
+loop on a synthetic ticker map.
+
+    python -m benchmarks.bench_matcher --tickers 2000 --headlines 500
+"""
+from __future__ import annotations
+import argparse
+import random
+import re
+import string
+import time
+from typing import Dict, Iterable, List
+
+from auto_research.matcher import KeywordMatcher, compile_ticker_map
+
+
+def legacy_match_tickers(text: str, ticker_map: Dict[str, Iterable[str]]) -> List[str]:
+    """The original news._match_tickers implementation."""
+    text_l = text.lower()
+    hits: List[str] = []
+    for ticker, keywords in ticker_map.items():
+        for kw in keywords:
+            if re.search(rf"\b{re.escape(str(kw).lower())}\b", text_l):
+                hits.append(ticker.upper())
+                break
+    return sorted(set(hits))
+
+
+def _word(rng: random.Random, lo: int = 3, hi: int = 9) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(lo, hi)))
+
+
+def synthetic_map(n: int, seed: int = 0) -> Dict[str, List[str]]:
+    """Tickers with a symbol, a company name and an 'X Inc' alias (prefix overlap on purpose)."""
+    rng = random.Random(seed)
+    out: Dict[str, List[str]] = {}
+    for i in range(n):
+        sym = "".join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(2, 4))) + str(i)
+        name = _word(rng).capitalize()
+        out[sym] = [sym, name, f"{name} Inc", f"{name}.com"]
+    return out
+
+
+def synthetic_headlines(ticker_map: Dict[str, List[str]], n: int, seed: int = 1) -> List[str]:
+    rng = random.Random(seed)
+    keywords = [kw for kws in ticker_map.values() for kw in kws]
+    out = []
+    for _ in range(n):
+        words = [_word(rng) for _ in range(rng.randint(8, 20))]
+        for _ in range(rng.randint(0, 3)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(keywords))
+        out.append(" ".join(words) + " https://example.com/" + _word(rng))
+    return out
+
+
+def _time(fn, texts) -> float:
+    t0 = time.perf_counter()
+    for t in texts:
+        fn(t)
+    return time.perf_counter() - t0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tickers", type=int, nargs="+", default=[10, 200, 2000])
+    ap.add_argument("--headlines", type=int, default=100)
+    args = ap.parse_args()
+
+    for n in args.tickers:
+        tmap = synthetic_map(n)
+        texts = synthetic_headlines(tmap, args.headlines)
+
+        t0 = time.perf_counter()
+        matcher = KeywordMatcher(tmap)
+        build = time.perf_counter() - t0
+
+        mismatches = sum(legacy_match_tickers(t, tmap) != matcher.match(t) for t in texts)
+        legacy = _time(lambda t: legacy_match_tickers(t, tmap), texts)
+        compiled = _time(matcher.match, texts)
+        cached = _time(lambda t: compile_ticker_map(tmap).match(t), texts[:50]) * len(texts) / 50
+
+        print(
+            f"tickers={n:>5} headlines={len(texts)} build={build * 1000:7.1f} ms  "
+            f"legacy={legacy * 1000:9.1f} ms  compiled={compiled * 1000:7.1f} ms  "
+            f"via-cache={cached * 1000:7.1f} ms  speedup={legacy / max(compiled, 1e-9):6.1f}x  "
+            f"mismatches={mismatches}"
+        )
+
+
+if __name__ == "__main__":
+    main()
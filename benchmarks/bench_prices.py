@@ -0,0 +1,62 @@
+"""
+Offline benchmark for prices.latest_prices using a fake fetch backend.
+
+    python -m benchmarks.bench_prices --symbols 1000 --chunk-size 200 --latency 0.05
+
+``--latency`` simulates the network round trip per bulk download, so the
+printed call count shows how many round trips a watchlist costs.
+"""
+from __future__ import annotations
+import argparse
+import time
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from auto_research.prices import latest_prices
+
+
+def make_fake_backend(days: int = 5, latency: float = 0.0, missing_every: int = 0, seed: int = 0):
+    """Return a backend producing random closes; every Nth symbol is dropped (simulated failure)."""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=pd.Timestamp("2024-01-05"), periods=days)
+    calls = {"n": 0}
+
+    def backend(symbols: List[str]) -> pd.DataFrame:
+        calls["n"] += 1
+        if latency:
+            time.sleep(latency)
+        keep = [s for i, s in enumerate(symbols) if not (missing_every and i % missing_every == 0)]
+        data = 100 + rng.standard_normal((days, len(keep))).cumsum(axis=0)
+        return pd.DataFrame(data, index=index, columns=keep)
+
+    backend.calls = calls
+    return backend
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--symbols", type=int, default=1000)
+    ap.add_argument("--chunk-size", type=int, default=200)
+    ap.add_argument("--latency", type=float, default=0.0)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    symbols = [f"S{i:05d}" for i in range(args.symbols)]
+    backend = make_fake_backend(latency=args.latency, missing_every=50)
+
+    timings = []
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        df = latest_prices(symbols, backend=backend, chunk_size=args.chunk_size)
+        timings.append(time.perf_counter() - t0)
+
+    print(f"symbols={args.symbols} chunk_size={args.chunk_size} rows={len(df)} "
+          f"nan_rows={int(df['last_price'].isna().sum())} "
+          f"calls/run={backend.calls['n'] // args.repeat}")
+    print(f"best={min(timings) * 1000:.1f} ms  median={sorted(timings)[len(timings) // 2] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
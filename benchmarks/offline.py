@@ -0,0 +1,166 @@
+"""
+Offline stand-ins for every network dependency, shared by the benchmarks.
+
+- ``scaled_feed``: a recorded RSS/Atom fixture replicated to N entries with
+  unique links/titles and recent timestamps.
+- ``LocalServer``: serves scaled feeds at ``/feeds/<fixture>?n=N`` and a FRED
+  stand-in at ``/fred/series/observations`` (honours observation_start).
+- ``temp_db``: points auto_research at a throwaway SQLite file.
+- ``fake_fred``: routes auto_research.macro to a LocalServer with no rate limit.
+"""
+from __future__ import annotations
+from typing import Dict, Iterator, Tuple
+import contextlib
+import datetime as dt
+import email.utils
+import http.server
+import json
+import re
+import tempfile
+import threading
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+FEED_FIXTURES = ("reuters_business.rss.xml", "markets.atom.xml")
+
+_ITEM = re.compile(rb"<(item|entry)>.*?</\1>", re.S)
+_LINK = re.compile(rb"(<link>[^<]*?|<link href=\"[^\"]*?)(\"|</link>)")
+_TITLE = re.compile(rb"(<title>[^<]*)(</title>)")
+_DATES = re.compile(rb"<(pubDate|published|updated)>[^<]*</\1>")
+
+
+def scaled_feed(fixture: str, n: int, now: dt.datetime = None) -> bytes:
+    """Replicate the fixture's items to ``n`` entries, one minute apart ending at ``now``."""
+    raw = (FIXTURES / fixture).read_bytes()
+    items = list(_ITEM.finditer(raw))
+    head, tail = raw[: items[0].start()], raw[items[-1].end():]
+    now = now or dt.datetime.now(dt.timezone.utc)
+    out = [head]
+    for k in range(n):
+        item = items[k % len(items)].group(0)
+        when = now - dt.timedelta(minutes=k)
+        rfc = email.utils.format_datetime(when, usegmt=True).encode()
+        iso = when.strftime("%Y-%m-%dT%H:%M:%SZ").encode()
+        item = _LINK.sub(
+            lambda m: m.group(1) + (b"&amp;" if b"?" in m.group(1) else b"?") + b"n=%d" % k + m.group(2),
+            item, count=1,
+        )
+        item = _TITLE.sub(lambda m: m.group(1) + b" #%d" % k + m.group(2), item, count=1)
+        item = _DATES.sub(lambda m: b"<%s>%s</%s>" % (m.group(1), rfc if m.group(1) == b"pubDate" else iso, m.group(1)), item)
+        out.append(item)
+    out.append(tail)
+    return b"\n".join(out)
+
+
+def fred_observations(rows: int, start: str = "1800-01-01") -> list:
+    """``rows`` daily observations in FRED's JSON shape (every 50th value missing, as ".")."""
+    template = json.loads((FIXTURES / "fred_observations.json").read_text())["observations"][0]
+    dates = pd.date_range(start, periods=rows, freq="D").strftime("%Y-%m-%d")
+    return [
+        {**template, "date": d, "value": "." if i % 50 == 49 else f"{100 + (i % 997) * 0.01:.3f}"}
+        for i, d in enumerate(dates)
+    ]
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    server: "LocalServer"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        qs = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if url.path.startswith("/feeds/"):
+            body = self.server.feed(url.path.rsplit("/", 1)[1], int(qs.get("n", 10)))
+            ctype = "application/xml"
+        elif url.path == "/fred/series/observations":
+            obs = [o for o in self.server.observations(qs.get("series_id", ""))
+                   if o["date"] >= qs.get("observation_start", "")]
+            body = json.dumps({"observations": obs}).encode()
+            ctype = "application/json"
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class LocalServer(http.server.ThreadingHTTPServer):
+    """Threaded localhost server for feeds and FRED; use as a context manager."""
+
+    daemon_threads = True
+
+    def __init__(self, fred_rows: int = 1000):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.fred_rows = fred_rows
+        self._feeds: Dict[Tuple[str, int], bytes] = {}
+        self._obs: Dict[int, list] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def feed_urls(self, total_entries: int, feeds: int = 4) -> list:
+        per = max(1, total_entries // feeds)
+        return [f"{self.base_url}/feeds/{FEED_FIXTURES[i % len(FEED_FIXTURES)]}?n={per}&f={i}" for i in range(feeds)]
+
+    def feed(self, fixture: str, n: int) -> bytes:
+        with self._lock:
+            if (fixture, n) not in self._feeds:
+                self._feeds[(fixture, n)] = scaled_feed(fixture, n)
+            return self._feeds[(fixture, n)]
+
+    def observations(self, series_id: str) -> list:
+        with self._lock:
+            if self.fred_rows not in self._obs:
+                self._obs[self.fred_rows] = fred_observations(self.fred_rows)
+            return self._obs[self.fred_rows]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+@contextlib.contextmanager
+def temp_db() -> Iterator[Path]:
+    """Point auto_research.db's process-wide engine at a throwaway SQLite file."""
+    import auto_research.db as db
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+        eng = db.make_engine(path)
+        original = db.set_engine(eng)
+        try:
+            db.ensure_db()
+            yield path
+        finally:
+            db.set_engine(original)
+            eng.dispose()
+
+
+@contextlib.contextmanager
+def fake_fred(server: LocalServer):
+    """Point auto_research.macro at ``server`` with a dummy key and no rate limiting."""
+    import auto_research.macro as macro
+
+    saved = (macro._FRED_SERIES_URL, macro.FRED_API_KEY, macro._limiter)
+    macro._FRED_SERIES_URL = f"{server.base_url}/fred/series/observations"
+    macro.FRED_API_KEY = "offline-benchmark"
+    macro._limiter = macro.TokenBucket(rate=1e9, capacity=10**9)
+    try:
+        yield
+    finally:
+        macro._FRED_SERIES_URL, macro.FRED_API_KEY, macro._limiter = saved
@@ -0,0 +1,347 @@
+"""
+Offline benchmark suite for every data path, at several scales.
+
+    python -m benchmarks.suite                          # all cases at 10 / 1k / 100k
+    python -m benchmarks.suite --scales 10 1000 --only news
+    python -m benchmarks.suite --show                   # history of recorded runs
+
+Nothing touches the network or the real caches/DB: feeds come from recorded
+RSS/Atom fixtures served on localhost, FRED from a local stand-in, prices from
+a fake yfinance backend, and all writes go to a temp SQLite file.
+
+Each run is appended to ``benchmarks/results/history.jsonl`` (commit, host,
+case, scale, best/median seconds) and compared with the previous run of the
+same case on the same host, so regressions show up as a ratio > 1.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse
+import datetime as dt
+import json
+import platform
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete
+
+from benchmarks.bench_matcher import synthetic_headlines, synthetic_map
+from benchmarks.bench_prices import make_fake_backend
+from benchmarks.offline import LocalServer, fake_fred, temp_db
+
+HISTORY_PATH = Path(__file__).resolve().parent / "results" / "history.jsonl"
+DEFAULT_SCALES = (10, 1_000, 100_000)
+
+# A case takes (scale, server) and returns (run, reset): ``run`` is timed,
+# ``reset`` (optional) restores cold state before each repeat, untimed.
+Case = Callable[[int, LocalServer], Tuple[Callable[[], object], Optional[Callable[[], None]]]]
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str):
+    def register(fn: Case) -> Case:
+        CASES[name] = fn
+        return fn
+    return register
+
+
+# ---------- News ----------
+TICKER_MAP = {
+    "AAPL": ["Apple", "iPhone"], "MSFT": ["Microsoft"], "TSLA": ["Tesla"], "NVDA": ["Nvidia"],
+    "AMZN": ["Amazon", "Prime Video"], "GOOGL": ["Alphabet", "Google"], "META": ["Meta Platforms", "Meta"],
+}
+
+
+@case("news.top_headlines")
+def _top_headlines(n, server):
+    from auto_research.news import top_headlines
+
+    urls = server.feed_urls(n)
+    for url in urls:  # build the scaled fixtures up front
+        server.feed(url.split("/feeds/")[1].split("?")[0], max(1, n // len(urls)))
+    hours = n // 60 + 48
+    return lambda: top_headlines(TICKER_MAP, feeds=urls, max_items=None, hours_lookback=hours, use_cache=False), None
+
+
+@case("news.match_tickers")
+def _match(n, server):
+    from auto_research.news import _match_tickers
+
+    ticker_map = synthetic_map(500)
+    heads = synthetic_headlines(ticker_map, n)
+    return lambda: [_match_tickers(h, ticker_map) for h in heads], None
+
+
+def _titles(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    words = np.array("stocks rally slump beats misses record weak strong outlook guidance cuts raises "
+                     "profit loss shares fall jump investors fear cheer earnings".split())
+    return pd.DataFrame({"title": [" ".join(rng.choice(words, 8)) + f" {i}" for i in range(n)]})
+
+
+@case("news.add_headline_sentiment[cold]")
+def _sentiment_cold(n, server):
+    from auto_research.news import add_headline_sentiment
+    from auto_research.sentiment import SentimentEngine
+
+    df = _titles(n)
+    state = {}
+    reset = lambda: state.update(engine=SentimentEngine())  # noqa: E731  (no persistent store)
+    return lambda: add_headline_sentiment(df, engine=state["engine"]), reset
+
+
+@case("news.add_headline_sentiment[warm]")
+def _sentiment_warm(n, server):
+    from auto_research.news import add_headline_sentiment
+    from auto_research.sentiment import SentimentEngine
+
+    df = _titles(n)
+    engine = SentimentEngine()
+    add_headline_sentiment(df, engine=engine)
+    return lambda: add_headline_sentiment(df, engine=engine), None
+
+
+# ---------- Prices ----------
+@case("prices.latest_prices")
+def _latest_prices(n, server):
+    from auto_research.prices import latest_prices
+
+    symbols = [f"S{i:06d}" for i in range(n)]
+    backend = make_fake_backend(missing_every=50)
+    return lambda: latest_prices(symbols, backend=backend), None
+
+
+@case("prices.snapshot_store[update+top_movers]")
+def _snapshot_store(n, server):
+    from auto_research.prices import latest_prices
+    from auto_research.snapshot import PriceSnapshotStore
+
+    df = latest_prices([f"S{i:06d}" for i in range(n)], backend=make_fake_backend(missing_every=50))
+    store = PriceSnapshotStore()
+    store.update_frame(df)
+
+    def run():
+        store.update_frame(df)
+        return store.top_movers(10), store.get("S000001"), store.frame()
+
+    return run, None
+
+
+# ---------- Macro ----------
+def _macro_reset():
+    from auto_research.db import MacroObservation, MacroSeries, get_engine
+
+    with get_engine().begin() as conn:
+        conn.execute(delete(MacroObservation.__table__))
+        conn.execute(delete(MacroSeries.__table__))
+
+
+@case("macro.macro_dataframe[cold]")
+def _macro_cold(n, server):
+    from auto_research.macro import macro_dataframe
+
+    def run():
+        server.fred_rows = n
+        return macro_dataframe(["BENCH_A", "BENCH_B"], start="1800-01-01", max_age=None)
+
+    return run, _macro_reset
+
+
+@case("macro.macro_dataframe[incremental]")
+def _macro_incremental(n, server):
+    from auto_research.macro import macro_dataframe
+
+    server.fred_rows = n
+    _macro_reset()
+    macro_dataframe(["BENCH_A", "BENCH_B"], start="1800-01-01", max_age=None)
+
+    def run():
+        server.fred_rows = n
+        return macro_dataframe(["BENCH_A", "BENCH_B"], start="1800-01-01", max_age=None)
+
+    return run, None
+
+
+# ---------- DB ----------
+@case("db.save_prices_snapshot")
+def _save_prices(n, server):
+    from auto_research.db import save_prices_snapshot
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "ticker": [f"S{i % 5000:04d}" for i in range(n)],
+        "last_price": rng.uniform(10, 500, n),
+        "pct_change": rng.normal(0, 2, n),
+    })
+    return lambda: save_prices_snapshot(df, limit=None), None
+
+
+@case("db.save_news_snapshot")
+def _save_news(n, server):
+    from auto_research.db import save_news_snapshot
+
+    df = pd.DataFrame({
+        "published": pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(n), unit="min"),
+        "title": [f"headline {i}" for i in range(n)],
+        "link": [f"https://example.com/story/{i}" for i in range(n)],
+        "tickers": [["AAPL", "MSFT"] if i % 3 else ["TSLA"] for i in range(n)],
+        "sentiment": "Neutral",
+        "sentiment_score": 0.0,
+    })
+    return lambda: save_news_snapshot(df, limit=None), None
+
+
+@case("db.save_news_snapshot[linkless]")
+def _save_news_linkless(n, server):
+    from auto_research.db import save_news_snapshot
+
+    # Feeds without links: every row is a plain insert, no upsert/staging
+    df = pd.DataFrame({
+        "published": pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(n), unit="min"),
+        "title": [f"linkless headline {i}" for i in range(n)],
+        "link": "",
+        "tickers": [["AAPL"] for _ in range(n)],
+        "sentiment_score": 0.1,
+    })
+    return lambda: save_news_snapshot(df, limit=None), None
+
+
+@case("queries.news_history[ticker]")
+def _news_by_ticker(n, server):
+    from auto_research.db import News, NewsTicker, SentimentRollup, get_engine, save_news_snapshot
+    from auto_research.queries import news_history
+
+    with get_engine().begin() as conn:
+        for model in (SentimentRollup, NewsTicker, News):
+            conn.execute(delete(model.__table__))
+    rng = np.random.default_rng(0)
+    symbols = np.array([f"S{i:03d}" for i in range(500)])
+    save_news_snapshot(pd.DataFrame({
+        "published": pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(n), unit="min"),
+        "title": [f"headline {i}" for i in range(n)],
+        "link": [f"https://example.com/lookup/{i}" for i in range(n)],
+        "tickers": [list(rng.choice(symbols, 2, replace=False)) for _ in range(n)],
+    }), limit=None)
+    return lambda: news_history(["S007", "S123"]), None
+
+
+@case("queries.sentiment_trend")
+def _sentiment_trend(n, server):
+    from auto_research.db import News, NewsTicker, SentimentRollup, get_engine, save_news_snapshot
+    from auto_research.queries import sentiment_trend
+
+    with get_engine().begin() as conn:
+        for model in (SentimentRollup, NewsTicker, News):
+            conn.execute(delete(model.__table__))
+    rng = np.random.default_rng(0)
+    save_news_snapshot(pd.DataFrame({
+        "published": pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 365 * 24 * 60, n), unit="min"),
+        "title": [f"headline {i}" for i in range(n)],
+        "link": [f"https://example.com/trend/{i}" for i in range(n)],
+        "tickers": [[f"S{i % 20:03d}"] for i in range(n)],
+        "sentiment_score": rng.uniform(-1, 1, n),
+    }), limit=None)
+    return lambda: sentiment_trend(["S001", "S002", "S003"], bucket="day"), None
+
+
+# ---------- Runner ----------
+def _commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=Path(__file__).resolve().parents[1], timeout=10)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _load_history(path: Path) -> List[dict]:
+    if not path.exists():
+        return []
+    with path.open() as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def _previous(history: List[dict], host: str, name: str, scale: int) -> Optional[dict]:
+    for rec in reversed(history):
+        if rec["host"] == host and rec["case"] == name and rec["scale"] == scale:
+            return rec
+    return None
+
+
+def run_suite(scales, only: Optional[List[str]], repeat: int, history_path: Optional[Path]) -> List[dict]:
+    names = [c for c in CASES if not only or any(o in c for o in only)]
+    host, commit = platform.node(), _commit()
+    history = _load_history(history_path) if history_path else []
+    stamp = dt.datetime.utcnow().isoformat(timespec="seconds")
+    results = []
+
+    print(f"{'case':<38}{'scale':>9}{'best':>11}{'median':>11}{'per item':>12}{'vs prev':>9}")
+    with LocalServer() as server, temp_db(), fake_fred(server):
+        for name in names:
+            for n in scales:
+                run, reset = CASES[name](n, server)
+                timings = []
+                for _ in range(repeat if n < 100_000 else 1):
+                    if reset:
+                        reset()
+                    t0 = time.perf_counter()
+                    run()
+                    timings.append(time.perf_counter() - t0)
+                rec = {
+                    "ts": stamp, "commit": commit, "host": host, "python": platform.python_version(),
+                    "case": name, "scale": n, "repeat": len(timings),
+                    "best_s": min(timings), "median_s": statistics.median(timings),
+                }
+                prev = _previous(history, host, name, n)
+                ratio = f"{rec['best_s'] / prev['best_s']:.2f}x" if prev and prev["best_s"] else "-"
+                print(f"{name:<38}{n:>9}{rec['best_s'] * 1e3:>9.1f}ms{rec['median_s'] * 1e3:>9.1f}ms"
+                      f"{rec['best_s'] / n * 1e6:>10.2f}us{ratio:>9}")
+                results.append(rec)
+
+    if history_path:
+        history_path.parent.mkdir(parents=True, exist_ok=True)
+        with history_path.open("a") as fh:
+            for rec in results:
+                fh.write(json.dumps(rec) + "\n")
+    return results
+
+
+def show_history(path: Path, last: int) -> None:
+    history = _load_history(path)
+    if not history:
+        print(f"No results recorded in {path}")
+        return
+    df = pd.DataFrame(history)
+    df["run"] = df["ts"] + " " + df["commit"].fillna("?")
+    runs = list(dict.fromkeys(df["run"]))[-last:]
+    table = df[df["run"].isin(runs)].pivot_table(index=["case", "scale"], columns="run", values="best_s", aggfunc="min")
+    with pd.option_context("display.width", 200, "display.max_columns", None, "display.float_format", "{:.4f}".format):
+        print(table[runs])
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    ap.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES))
+    ap.add_argument("--only", nargs="+", default=None, help="substrings of case names to run")
+    ap.add_argument("--repeat", type=int, default=3, help="repeats per case (scales >= 100k run once)")
+    ap.add_argument("--history", type=Path, default=HISTORY_PATH)
+    ap.add_argument("--no-save", action="store_true", help="do not append results to the history file")
+    ap.add_argument("--show", type=int, nargs="?", const=5, default=None, metavar="N",
+                    help="print best times of the last N recorded runs and exit")
+    ap.add_argument("--list", action="store_true", help="list case names and exit")
+    args = ap.parse_args()
+
+    if args.list:
+        print("\n".join(CASES))
+        return
+    if args.show is not None:
+        show_history(args.history, args.show)
+        return
+    run_suite(args.scales, args.only, args.repeat, None if args.no_save else args.history)
+
+
+if __name__ == "__main__":
+    main()